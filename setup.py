@@ -33,6 +33,9 @@ INSTALL_DEPS = [
 if sys.version_info < (2, 7):
     INSTALL_DEPS.append('importlib')
 
+if sys.version_info < (3, 2):
+    INSTALL_DEPS.append('futures')
+
 setup(
     # Basic info
     name=name,
@@ -67,6 +70,9 @@ setup(
             'flake8',
             'manuel',
         ],
+        'lxml': ['lxml'],
+        'numpy': ['numpy'],
+        'pandas': ['numpy', 'pandas'],
     },
 
     # Scripts
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Asyncio support for pygov_br clients.
+
+This module requires Python 3.6+ and is not imported by the package itself.
+Requests are performed by the synchronous :class:`pygov_br.base.Client` code
+on an executor, so the XML parsing and type conversion are the very same of
+the blocking clients. The number of requests in flight is bounded per host.
+A :class:`pygov_br.base.RateLimiter` given to the clients is also waited for
+on the executor, without blocking the event loop. Methods yielding results
+are mirrored by asynchronous generators, each item being produced on the
+executor.
+"""
+from urllib.parse import urlparse
+import asyncio
+import functools
+import inspect
+
+_DONE = object()
+
+
+class HostLimiter(object):
+    """Bound the number of concurrent requests to each host.
+
+    A limiter may be shared between several asynchronous clients so that
+    clients pointing to the same host share the same limit.
+
+    Args:
+        limit (int, optional): Maximum number of concurrent requests per host.
+            Defaults to 4.
+    """
+
+    def __init__(self, limit=4):
+        self.limit = limit
+        self._semaphores = {}
+
+    def get(self, host):
+        netloc = urlparse(host).netloc or host
+        if netloc not in self._semaphores:
+            self._semaphores[netloc] = asyncio.Semaphore(self.limit)
+        return self._semaphores[netloc]
+
+
+async def acquire(limiter, tokens=1):
+    """Wait for `tokens` of a :class:`pygov_br.base.RateLimiter`.
+
+    The event loop is not blocked while waiting, so the limiter may be used
+    by coroutines that do not run on an executor.
+    """
+    delay = limiter.reserve(tokens)
+    if delay > 0:
+        await asyncio.sleep(delay)
+    return delay
+
+
+class AsyncClient(object):
+    """Mixin that runs the methods of a synchronous client on an executor.
+
+    Args:
+        max_concurrency (int, optional): Maximum number of concurrent
+            requests per host. Ignored if `limiter` is given.
+        limiter (HostLimiter, optional): Limiter shared between clients.
+        executor (concurrent.futures.Executor, optional): Executor used to
+            run the requests. Defaults to the event loop default executor.
+
+    Any other keyword argument is passed to the synchronous client.
+    """
+
+    def __init__(self, max_concurrency=4, limiter=None, executor=None,
+                 **kwargs):
+        kwargs.setdefault('pool_maxsize', max_concurrency)
+        super(AsyncClient, self).__init__(**kwargs)
+        self.limiter = limiter or HostLimiter(max_concurrency)
+        self.executor = executor
+
+    async def _run(self, method, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        call = functools.partial(method, self, *args, **kwargs)
+        async with self.limiter.get(self.host):
+            return await loop.run_in_executor(self.executor, call)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+
+def _coroutine_method(method):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        return await self._run(method, *args, **kwargs)
+    return wrapper
+
+
+def _generator_method(method):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        generator = method(self, *args, **kwargs)
+        try:
+            while True:
+                async with self.limiter.get(self.host):
+                    item = await loop.run_in_executor(
+                        self.executor, next, generator, _DONE)
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            await loop.run_in_executor(self.executor, generator.close)
+    return wrapper
+
+
+def make_async(client_class):
+    """Build the asyncio variant of a synchronous client class.
+
+    Every public method of `client_class` is mirrored by a coroutine with the
+    same signature and return value. Generator methods are mirrored by
+    asynchronous generators yielding the same items.
+
+    Args:
+        client_class (type): A :class:`pygov_br.base.Client` subclass.
+
+    Returns:
+        type: A new class named ``Async<ClientName>``.
+    """
+    namespace = {'__module__': client_class.__module__}
+    for name, member in vars(client_class).items():
+        if name.startswith('_') or not callable(member):
+            continue
+        if inspect.isgeneratorfunction(member):
+            namespace[name] = _generator_method(member)
+        else:
+            namespace[name] = _coroutine_method(member)
+    name = 'Async' + client_class.__name__
+    return type(name, (AsyncClient, client_class), namespace)
@@ -1,21 +1,505 @@
 # -*- coding: utf-8 -*-
 from distutils.util import strtobool
-from xml.etree.ElementTree import fromstring, ElementTree
+from xml.etree.ElementTree import fromstring, iterparse
 from pygov_br.exceptions import ClientError, ClientServerError
-from datetime import datetime
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from email.utils import parsedate_tz, mktime_tz
 from inspect import isclass
+from requests.adapters import HTTPAdapter
+from threading import Condition, Lock, local
+from time import sleep, time as timestamp
+from timeit import default_timer
+import itertools
 import pytz
 import logging
+import os
+import random
+import re
 import requests
 import sys
 
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # pragma: no cover
+    lxml_etree = None
+
 if sys.version_info < (3, 0):  # pragma: no cover
     from urlparse import urljoin
+    string_types = basestring  # noqa: F821
 else:  # pragma: no cover
     from urllib.parse import urljoin
+    string_types = str
 
 log = logging.getLogger('pygov_br.client')
 
+BatchResult = namedtuple('BatchResult', ['item', 'result', 'error'])
+
+TIMEZONE = pytz.timezone('America/Sao_Paulo')
+
+# Common shapes of typed values sent by the webservices. Only the outer
+# groups are named, so `match.lastgroup` tells which conversion to apply.
+TYPED_PATTERN = re.compile(r"""
+    (?:
+        (?P<int>[-+]?[0-9]+)
+      | (?P<float>[-+]?(?:[0-9]+\.[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?)
+      | (?P<date>[0-9]{1,2}/[0-9]{1,2}/[0-9]{4})
+      | (?P<datetime>[0-9]{1,2}/[0-9]{1,2}/[0-9]{4}\ [0-9]{1,2}:[0-9]{1,2}
+                      (?::[0-9]{1,2})?)
+      | (?P<time>[0-9]{1,2}:[0-9]{1,2}(?::[0-9]{1,2})?)
+    )\Z""", re.VERBOSE)
+
+# Anything `int`, `float` or the date formats may still accept. Strings that
+# do not match it can only be kept as text.
+MAYBE_TYPED_PATTERN = re.compile(r"""
+    \s*[-+]?
+    (?:[\d\s._eE/:+-]*\d[\d\s._eE/:+-]*|inf(?:inity)?|nan)
+    \s*\Z""", re.VERBOSE | re.IGNORECASE | re.UNICODE)
+
+BOOLEANS = {
+    'y': True, 'yes': True, 't': True, 'true': True, 'on': True,
+    'n': False, 'no': False, 'f': False, 'false': False, 'off': False,
+}
+
+BINARY = {'1': True, '0': False}
+
+
+def _to_date(string):
+    day, month, year = string.split('/')
+    return date(int(year), int(month), int(day))
+
+
+def _to_datetime(string):
+    date_string, time_string = string.split(' ')
+    day, month, year = date_string.split('/')
+    return TIMEZONE.localize(datetime(int(year), int(month), int(day),
+                                      *_split_time(time_string)))
+
+
+def _to_time(string):
+    return time(*_split_time(string))
+
+
+def _split_time(string):
+    return [int(value) for value in string.split(':')]
+
+
+def _to_bool(string):
+    boolean = BOOLEANS.get(string.lower(), BINARY.get(string))
+    if boolean is None:
+        raise ValueError('Invalid boolean value: {0!r}'.format(string))
+    return boolean
+
+
+def _to_text(string):
+    return string.strip()
+
+
+TYPED_CONVERTERS = {
+    'int': int,
+    'float': float,
+    'date': _to_date,
+    'datetime': _to_datetime,
+    'time': _to_time,
+}
+
+SCHEMA_CONVERTERS = {
+    int: int,
+    float: float,
+    bool: _to_bool,
+    str: _to_text,
+    date: _to_date,
+    datetime: _to_datetime,
+    time: _to_time,
+}
+
+
+class EtreeParser(object):
+    """XML parser backend of the standard library."""
+
+    name = 'etree'
+
+    def fromstring(self, data):
+        return fromstring(data)
+
+    def iterparse(self, source, events):
+        return iterparse(source, events=events)
+
+
+class LxmlParser(object):
+    """XML parser backend based on lxml, usually the fastest one.
+
+    Comments and processing instructions are discarded, and entities are
+    not resolved, so the parsed elements are handled exactly like the ones
+    of :class:`EtreeParser`.
+
+    Args:
+        huge_tree (bool, optional): Whether to disable the libxml2 limits on
+            the size and depth of documents, protecting from malicious
+            responses. Defaults to False.
+    """
+
+    name = 'lxml'
+
+    def __init__(self, huge_tree=False):
+        if lxml_etree is None:
+            raise ImportError('The lxml parser requires lxml to be installed')
+        self.options = {
+            'remove_comments': True,
+            'remove_pis': True,
+            'resolve_entities': False,
+            'huge_tree': huge_tree,
+        }
+        self._parser = lxml_etree.XMLParser(**self.options)
+
+    def fromstring(self, data):
+        return lxml_etree.fromstring(data, self._parser)
+
+    def iterparse(self, source, events):
+        return lxml_etree.iterparse(source, events=events, **self.options)
+
+
+PARSERS = {
+    'etree': EtreeParser,
+    'lxml': LxmlParser,
+}
+
+
+def get_parser(name=None):
+    """Return an XML parser backend by name.
+
+    Args:
+        name (str, optional): Either 'lxml' or 'etree'. Defaults to lxml if
+            it is installed, otherwise to the standard library parser.
+    """
+    if name is None:
+        name = 'etree' if lxml_etree is None else 'lxml'
+    try:
+        parser_class = PARSERS[name]
+    except KeyError:
+        raise ValueError('Unknown XML parser: {0!r}'.format(name))
+    return parser_class()
+
+
+class RetryPolicy(object):
+    """Retry requests that failed with a server or connection error.
+
+    Failed attempts are retried after an exponential backoff of ``backoff *
+    2 ** (retry - 1)`` seconds, capped at `max_backoff`. A random fraction,
+    up to `jitter`, of the delay is subtracted from it so that concurrent
+    clients do not retry in lockstep. A `Retry-After` header, in seconds or
+    as an HTTP date, takes precedence over the backoff, still capped at
+    `max_backoff`.
+
+    A policy may be shared between clients, in which case the counters sum
+    up the retries of all of them.
+
+    Args:
+        max_attempts (int, optional): Maximum number of attempts of each
+            request, the first one included. Defaults to 3.
+        backoff (float, optional): Delay, in seconds, before the first
+            retry. Defaults to 0.5.
+        max_backoff (float, optional): Maximum delay, in seconds, between
+            attempts. Defaults to 30.
+        jitter (float, optional): Maximum fraction of the delay, between 0
+            and 1, randomly subtracted from it. Defaults to 0.5.
+        statuses (iterable, optional): HTTP status codes to be retried.
+            Defaults to 429, 500, 502, 503 and 504.
+        retry_errors (bool, optional): Whether connection errors and
+            timeouts are retried. Defaults to True.
+
+    Attributes:
+        retries (int): Number of retried attempts.
+        recovered (int): Number of requests that succeeded after a retry.
+        exhausted (int): Number of requests that failed every attempt.
+    """
+
+    def __init__(self, max_attempts=3, backoff=0.5, max_backoff=30,
+                 jitter=0.5, statuses=(429, 500, 502, 503, 504),
+                 retry_errors=True):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.retry_errors = retry_errors
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+        self._counters_lock = Lock()
+
+    def next_delay(self, attempt, response=None, error=None):
+        """Return the delay, in seconds, before retrying a failed attempt.
+
+        Args:
+            attempt (int): Number of the failed attempt, starting at 1.
+            response (requests.Response, optional): Response of the attempt.
+            error (Exception, optional): Connection error or timeout raised
+                by the attempt, if there is no response.
+
+        Returns:
+            float: The delay, or None if the request must not be retried.
+        """
+        if error is not None:
+            retryable = self.retry_errors
+        else:
+            retryable = response.status_code in self.statuses
+        if not retryable:
+            return None
+
+        with self._counters_lock:
+            if attempt >= self.max_attempts:
+                self.exhausted += 1
+                return None
+            self.retries += 1
+
+        retry_after = self._retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+
+        delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        return delay - delay * self.jitter * random.random()
+
+    def record_recovery(self):
+        """Count a request that succeeded after being retried."""
+        with self._counters_lock:
+            self.recovered += 1
+
+    def reset(self):
+        """Reset the counters."""
+        with self._counters_lock:
+            self.retries = 0
+            self.recovered = 0
+            self.exhausted = 0
+
+    def _retry_after(self, response):
+        if response is None:
+            return None
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            parsed = parsedate_tz(value)
+            if parsed is None:
+                return None
+            return max(mktime_tz(parsed) - timestamp(), 0.0)
+
+
+class RateLimiter(object):
+    """Token bucket limiting the rate of requests.
+
+    The bucket holds up to `burst` tokens and is refilled at `rate` tokens
+    per second. Each request takes a token, waiting for it if the bucket is
+    empty. Tokens are reserved in the order they are requested, so waiting
+    requests are served first come, first served.
+
+    The limiter is thread-safe and may be shared between clients, even of
+    different hosts, to bound the rate of requests to the same origin::
+
+        limiter = RateLimiter(rate=5)
+        deputies = DeputyClient(rate_limiter=limiter)
+        proposals = ProposalClient(rate_limiter=limiter)
+
+    Coroutines must not block on :meth:`acquire`; they should sleep for the
+    delay returned by :meth:`reserve` instead, as done by
+    :func:`pygov_br.aio.acquire`.
+
+    Args:
+        rate (float): Number of requests per second.
+        burst (int, optional): Maximum number of requests sent at once after
+            an idle period. Defaults to `rate`, and at least 1.
+        clock (callable, optional): Function returning the current time, in
+            seconds. Defaults to :func:`timeit.default_timer`.
+    """
+
+    def __init__(self, rate, burst=None, clock=default_timer):
+        self.rate = float(rate)
+        self.burst = burst if burst is not None else max(int(rate), 1)
+        self.clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = Lock()
+
+    def reserve(self, tokens=1):
+        """Take `tokens` from the bucket, even if they are not available yet.
+
+        Returns:
+            float: Time, in seconds, to wait before the tokens are available.
+        """
+        with self._lock:
+            now = self.clock()
+            elapsed = now - self._updated
+            self._tokens = min(self._tokens + elapsed * self.rate, self.burst)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available and take them."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            sleep(delay)
+        return delay
+
+
+class HostScheduler(object):
+    """Bound and fairly share the requests to each webservice host.
+
+    Hosts are the base URLs of the clients, or the ones given by the `host`
+    argument of their requests, like the `Orgaos.asmx` and `Deputados.asmx`
+    services. Clients sharing a scheduler never have more than the host
+    limit of requests in flight to the same host; the exceeding requests
+    wait for a free slot.
+
+    :meth:`map` runs a batch of calls, possibly to several hosts, queueing
+    them by host and dispatching them in turns, so that the calls to a slow
+    host do not take all the workers while calls to other hosts wait.
+
+    Args:
+        max_per_host (int, optional): Maximum number of requests in flight
+            to each host. Defaults to 4.
+        limits (dict, optional): Maximum number of requests in flight by
+            host, overriding `max_per_host`.
+        workers (int, optional): Number of threads used by :meth:`map`.
+            Defaults to 8.
+    """
+
+    def __init__(self, max_per_host=4, limits=None, workers=8):
+        for limit in [max_per_host] + list((limits or {}).values()):
+            if limit < 1:
+                raise ValueError('Host limits must be at least 1, '
+                                 'got {0}'.format(limit))
+        self.max_per_host = max_per_host
+        self.limits = dict(limits or {})
+        self.workers = workers
+        self._in_flight = {}
+        self._condition = Condition()
+
+    def limit(self, host):
+        """Return the maximum number of requests in flight to `host`."""
+        return self.limits.get(host, self.max_per_host)
+
+    def in_flight(self):
+        """Return the number of requests in flight by host."""
+        with self._condition:
+            return dict(self._in_flight)
+
+    @contextmanager
+    def slot(self, host):
+        """Wait for a free slot of `host` and hold it within the block."""
+        with self._condition:
+            while self._in_flight.get(host, 0) >= self.limit(host):
+                self._condition.wait()
+            self._in_flight[host] = self._in_flight.get(host, 0) + 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight[host] -= 1
+                if not self._in_flight[host]:
+                    del self._in_flight[host]
+                self._condition.notify_all()
+
+    def map(self, tasks, workers=None, ordered=True):
+        """Run a batch of calls, taking turns between their hosts.
+
+        Args:
+            tasks (iterable): Calls as ``(function, args)`` tuples, or
+                ``(function, args, host)`` if `function` is neither a method
+                of a client nor marked with :func:`requests_host`.
+            workers (int, optional): Number of threads. Defaults to the
+                scheduler `workers`.
+            ordered (bool, optional): Whether results are yielded in the
+                order of `tasks`. Defaults to True.
+
+        Yields:
+            BatchResult: The task, its result and the error raised, if any.
+        """
+        workers = workers or self.workers
+        queues = {}
+        hosts = deque()
+        for index, task in enumerate(tasks):
+            host = task[2] if len(task) > 2 else _client_host(task[0])
+            if host not in queues:
+                queues[host] = deque()
+                hosts.append(host)
+            queues[host].append((index, task))
+
+        running = dict((host, 0) for host in hosts)
+        finished = {}
+        next_index = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            while hosts or futures:
+                submitted = True
+                while submitted and hosts and len(futures) < workers:
+                    submitted = False
+                    for host in list(hosts):
+                        if len(futures) >= workers:
+                            break
+                        if running[host] >= self.limit(host):
+                            continue
+                        index, task = queues[host].popleft()
+                        future = executor.submit(_call_task, task)
+                        futures[future] = (index, host)
+                        running[host] += 1
+                        submitted = True
+                        if not queues[host]:
+                            hosts.remove(host)
+                    hosts.rotate(-1)
+
+                done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, host = futures.pop(future)
+                    running[host] -= 1
+                    if ordered:
+                        finished[index] = future.result()
+                    else:
+                        yield future.result()
+
+                while next_index in finished:
+                    yield finished.pop(next_index)
+                    next_index += 1
+
+
+def _truncate(content, max_bytes):
+    if len(content) <= max_bytes:
+        return repr(content)
+    return '{0!r}... ({1} bytes)'.format(content[:max_bytes], len(content))
+
+
+def requests_host(host):
+    """Mark a client method as requesting `host` instead of the client one.
+
+    :class:`HostScheduler` queues the calls of marked methods by `host`.
+    """
+    def decorator(method):
+        method.host = host
+        return method
+    return decorator
+
+
+def _client_host(function):
+    host = getattr(function, 'host', None)
+    if host is not None:
+        return host
+    client = getattr(function, '__self__', None)
+    return getattr(client, 'host', None)
+
+
+def _call_task(task):
+    function, args = task[0], task[1]
+    try:
+        return BatchResult(task, function(*args), None)
+    except Exception as error:
+        return BatchResult(task, None, error)
+
 
 class ClientWrapper(object):
     """Base class to client wrapper."""
@@ -28,28 +512,272 @@ class ClientWrapper(object):
                 value = kwargs[key]
             setattr(self, key, value)
 
+    def _clients(self):
+        return [value for value in vars(self).values()
+                if isinstance(value, Client)]
+
+    def close(self):
+        """Close the HTTP sessions of all wrapped clients."""
+        for client in self._clients():
+            client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
 
 class Client(object):
-    """Base class to interact with API."""
+    """Base class to interact with API.
 
-    def __init__(self, host, timeout=None):
+    Each client keeps a :class:`requests.Session`, so consecutive requests
+    reuse pooled keep-alive connections instead of opening a new one per
+    call. A session may be shared between clients by passing it through the
+    `session` argument; in that case the pool settings are ignored and the
+    client will not close it.
+
+    Args:
+        host (str): Base URL of the webservice.
+        timeout (float, optional): Timeout, in seconds, of each request.
+        session (requests.Session, optional): Session to be used instead of
+            creating a new one.
+        pool_connections (int, optional): Number of host pools to cache.
+        pool_maxsize (int, optional): Maximum number of connections kept
+            alive per host.
+        cache (pygov_br.cache.BaseCache, optional): Cache backend for
+            response bodies. Responses are not cached by default.
+        cache_ttls (dict, optional): Time to live, in seconds, of cached
+            responses by endpoint name. Overrides the client `cache_ttls`
+            defaults. A TTL of 0 disables caching for the endpoint; endpoints
+            not listed use the cache default TTL. Expired responses that
+            carry an `ETag` or `Last-Modified` header are revalidated with a
+            conditional request.
+        parser (str or object, optional): XML parser backend, either by name
+            ('lxml' or 'etree') or an instance. Defaults to lxml if it is
+            installed. Response bodies are parsed from their raw bytes.
+        retry (RetryPolicy, optional): Policy to retry requests that failed
+            with a server or connection error. Requests are not retried by
+            default.
+        rate_limiter (RateLimiter, optional): Limiter of the rate of
+            requests, usually shared with other clients. Each attempt of a
+            request takes a token.
+        scheduler (HostScheduler, optional): Scheduler bounding the
+            requests in flight to each host, usually shared with other
+            clients. Batches of the client are also run by it.
+        metrics (pygov_br.metrics.BaseSink, optional): Sink of the latency,
+            body size, parse and type conversion times of the requests, by
+            endpoint name.
+        log_body_bytes (int, optional): Maximum number of bytes of the
+            response bodies written to the debug log. Defaults to 1024.
+            Bodies are only rendered if debug logging is enabled.
+        dump_dir (str, optional): Directory where every response body, in
+            full, is written to a file. Bodies are not dumped by default.
+            Streamed bodies are never dumped.
+    """
+
+    cache_ttls = {}
+
+    def __init__(self, host, timeout=None, session=None, pool_connections=10,
+                 pool_maxsize=10, cache=None, cache_ttls=None, parser=None,
+                 retry=None, rate_limiter=None, scheduler=None,
+                 metrics=None, log_body_bytes=1024, dump_dir=None):
         self.host = host
         self.timeout = timeout
+        self.retry = retry
+        self.rate_limiter = rate_limiter
+        self.scheduler = scheduler
+        self.metrics = metrics
+        self.log_body_bytes = log_body_bytes
+        self.dump_dir = dump_dir
+        self._context = local()
+        self._dumps = itertools.count(1)
+        if parser is None or isinstance(parser, string_types):
+            parser = get_parser(parser)
+        self.parser = parser
+        self.cache = cache
+        self.cache_ttls = dict(self.cache_ttls, **(cache_ttls or {}))
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._owns_session = session is None
+        self._session = session
+        self._session_lock = Lock()
+
+    @property
+    def session(self):
+        # Worker threads of a fresh client may all ask for the session.
+        session = self._session
+        if session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._make_session()
+                session = self._session
+        return session
+
+    def _make_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def close(self):
+        """Close the HTTP session and release its pooled connections."""
+        with self._session_lock:
+            if self._session is not None and self._owns_session:
+                self._session.close()
+                self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
     def _get(self, path, **kwargs):
         return self._request('GET', path, kwargs)
 
+    def _map(self, function, items, workers=4, ordered=True):
+        """Call `function` for each item of `items` on a thread pool.
+
+        Each item is a tuple of positional arguments to `function`. Errors
+        are reported in the result instead of aborting the whole batch.
+
+        Yields:
+            BatchResult: A named tuple with the `item`, its `result` and the
+            `error` raised, if any. Results are yielded in the input order if
+            `ordered` is True, otherwise as soon as they are completed.
+        """
+        if self.scheduler is not None:
+            host = _client_host(function) or self.host
+            tasks = ((function, item, host) for item in items)
+            for result in self.scheduler.map(tasks, workers, ordered):
+                yield result._replace(item=result.item[1])
+            return
+
+        def call(item):
+            try:
+                return BatchResult(item, function(*item), None)
+            except Exception as error:
+                return BatchResult(item, None, error)
+
+        # Items are submitted as results are consumed, at most twice the
+        # number of workers ahead, so a closed generator stops the batch.
+        items = iter(items)
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            def submit():
+                for item in itertools.islice(items,
+                                             2 * workers - len(pending)):
+                    pending.append(executor.submit(call, item))
+
+            try:
+                submit()
+                while pending:
+                    if ordered:
+                        future = pending.popleft()
+                    else:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        future = done.pop()
+                        pending.remove(future)
+                    result = future.result()
+                    submit()
+                    yield result
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _iter_get(self, path, tag, **kwargs):
+        """Stream the records of a list endpoint.
+
+        The response body is parsed incrementally and each `tag` element
+        child of the root is yielded, converted to a dictionary, as soon as
+        it is complete. Consumed elements are discarded, so memory usage does
+        not depend on the size of the response.
+        """
+        self._context.endpoint = path.split('?')[0]
+        response = self._send('GET', path, kwargs, stream=True)
+        response.raw.decode_content = True
+        try:
+            for record in self._iter_tree(response.raw, tag):
+                yield record
+        finally:
+            response.close()
+
+    def _iter_tree(self, source, tag):
+        depth = 0
+        root = None
+        events = self.parser.iterparse(source, ('start', 'end'))
+        for event, element in events:
+            if event == 'start':
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+
+            depth -= 1
+            if depth == 1 and element.tag == tag:
+                yield self._make_dict_from_tree(element)[tag]
+                root.clear()
+
     def _request(self, verb, path, params):
+        endpoint = path.split('?')[0]
+        self._context.endpoint = endpoint
+        if self.cache is None:
+            return self._send(verb, path, params).content
+
+        ttl = self.cache_ttls.get(endpoint, self.cache.ttl)
+        if not ttl:
+            return self._send(verb, path, params).content
+
+        key = self._cache_key(verb, path, params)
+        entry = self.cache.get_entry(key)
+        if entry is not None and entry.fresh:
+            return entry.value
+
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        response = self._send(verb, path, params, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self.cache.set(key, entry.value, ttl, entry.etag,
+                           entry.last_modified)
+            return entry.value
+
+        self.cache.set(key, response.content, ttl,
+                       response.headers.get('ETag'),
+                       response.headers.get('Last-Modified'))
+        return response.content
+
+    def _cache_key(self, verb, path, params):
+        host = params.get('host', None) or self.host
+        params = dict((key, value) for key, value in params.items()
+                      if key != 'host')
+        request = requests.Request(verb, urljoin(host, path), params=params)
+        return '{0} {1}'.format(verb, request.prepare().url)
+
+    def _send(self, verb, path, params, stream=False, headers=None):
         host = params.pop('host', None)
-        if host:
-            url = urljoin(host, path)
-        else:
-            url = urljoin(self.host, path)
+        host = host or self.host
+        url = urljoin(host, path)
+        endpoint = path.split('?')[0]
 
-        response = requests.request(verb, url, params=params,
-                                    timeout=self.timeout)
-        log.debug('Response [{0}]: {1}'.format(response.status_code,
-                                               repr(response.text)))
+        response = self._send_with_retry(verb, url, host, endpoint,
+                                         params=params, headers=headers,
+                                         timeout=self.timeout, stream=stream)
+        if self.metrics is not None and not stream:
+            self.metrics.record(endpoint, 'bytes', len(response.content))
+        if not stream:
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug('Response [%s] %s: %s', response.status_code, url,
+                          _truncate(response.content, self.log_body_bytes))
+            if self.dump_dir is not None:
+                self._dump(path, response)
 
         if not response.ok:
             msg = "[{0}]: {1}".format(response.status_code, response.reason)
@@ -58,66 +786,214 @@ class Client(object):
             else:
                 raise ClientServerError(msg + response.text, response=response)
 
-        return response.text
+        return response
+
+    def _parse(self, content):
+        """Parse a response body, as bytes, to its root element."""
+        start = default_timer()
+        root = self.parser.fromstring(content)
+        self._record('parse', start)
+        return root
+
+    def _record(self, metric, start, endpoint=None):
+        """Record the time elapsed since `start` for `endpoint`.
 
-    def _xml_attributes_to_list(self, xml_string, xml_tag):
-        element_list = []
-        element_tree = ElementTree(fromstring(xml_string.encode('utf-8')))
-        for element in element_tree.findall(xml_tag):
-            element_list.append(element.attrib)
-        return element_list
+        Defaults to the endpoint last requested by the current thread, or
+        ``'unknown'`` if it did not request any.
+        """
+        if self.metrics is not None:
+            if endpoint is None:
+                endpoint = getattr(self._context, 'endpoint', None)
+            self.metrics.record(endpoint or 'unknown', metric,
+                                default_timer() - start)
+
+    def _dump(self, path, response):
+        """Write the body of `response` to a file of the dump directory."""
+        try:
+            os.makedirs(self.dump_dir)
+        except OSError:
+            if not os.path.isdir(self.dump_dir):
+                raise
+        name = '{0:.6f}-{1}-{2}-{3}.xml'.format(
+            timestamp(), next(self._dumps), path.split('?')[0].strip('/'),
+            response.status_code)
+        file_path = os.path.join(self.dump_dir, name.replace('/', '_'))
+        with open(file_path, 'wb') as dump_file:
+            dump_file.write(response.content)
+        log.debug('Response body dumped to %s', file_path)
+
+    def _send_with_retry(self, verb, url, host, endpoint, **kwargs):
+        attempt = 1
+        while True:
+            response, error = None, None
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                if self.scheduler is None:
+                    response = self._timed_request(verb, url, endpoint,
+                                                   **kwargs)
+                else:
+                    with self.scheduler.slot(host):
+                        response = self._timed_request(verb, url, endpoint,
+                                                       **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error = exc
+
+            delay = None
+            if self.retry is not None and (error is not None or
+                                           not response.ok):
+                delay = self.retry.next_delay(attempt, response, error)
+            if delay is None:
+                break
+
+            reason = error if response is None else response.status_code
+            log.warning('Retrying %s in %.2fs after attempt %d failed: %s',
+                        url, delay, attempt, reason)
+            if response is not None:
+                response.close()
+            sleep(delay)
+            attempt += 1
+
+        if error is not None:
+            raise error
+        if attempt > 1 and response.ok:
+            self.retry.record_recovery()
+        return response
+
+    def _timed_request(self, verb, url, endpoint, **kwargs):
+        start = default_timer()
+        response = self.session.request(verb, url, **kwargs)
+        self._record('latency', start, endpoint)
+        return response
+
+    def _xml_attributes_to_list(self, content, xml_tag):
+        root = self._parse(content)
+        return [dict(element.attrib) for element in root.findall(xml_tag)]
 
     def _tree_attributes_to_list(self, element_tree, parent):
         elements = element_tree.find(parent)
-        elements_list = []
-        for child in elements.getchildren():
-            elements_list.append(child.attrib)
-        return elements_list
+        return [dict(child.attrib) for child in elements]
 
-    def _xml_to_dict(self, xml_string):
-        etree = ElementTree(fromstring(xml_string.encode('utf-8')))
-        return self._make_dict_from_tree(etree.getroot())
+    def _xml_to_dict(self, content):
+        return self._make_dict_from_tree(self._parse(content))
 
     def _make_dict_from_tree(self, element_tree):
-        def internal_iter(tree, accum):
-            if tree is None:
-                return accum
-
-            if tree.getchildren():
-                accum[tree.tag] = {}
-                for each in tree.getchildren():
-                    result = internal_iter(each, {})
-                    if each.tag in accum[tree.tag]:
-                        if not isinstance(accum[tree.tag][each.tag], list):
-                            accum[tree.tag][each.tag] = [
-                                accum[tree.tag][each.tag]
-                            ]
-                        accum[tree.tag][each.tag].append(result[each.tag])
-                    else:
-                        accum[tree.tag].update(result)
+        """Convert an element and its descendants to nested dictionaries.
+
+        Leaf elements are converted to their text and repeated tags are
+        grouped in lists. The tree is walked with an explicit stack, each
+        value being inserted directly in its parent dictionary.
+        """
+        start = default_timer()
+        result = {}
+        if element_tree is None:
+            return result
+
+        stack = [(element_tree, result)]
+        while stack:
+            element, parent = stack.pop()
+            if len(element):
+                value = {}
+                for child in reversed(element):
+                    stack.append((child, value))
+            else:
+                value = element.text
+
+            tag = element.tag
+            if tag not in parent:
+                parent[tag] = value
+            elif isinstance(parent[tag], list):
+                parent[tag].append(value)
             else:
-                accum[tree.tag] = tree.text
+                parent[tag] = [parent[tag], value]
 
-            return accum
+        self._record('to_dict', start)
+        return result
 
-        return internal_iter(element_tree, {})
+    def _safe(self, element, schema=None, endpoint=None):
+        """Convert the strings of a response to Python types.
 
-    def _safe(self, element):
+        Args:
+            element: A response converted to a dictionary, or a list of them.
+            schema (dict, optional): Type of known fields, like `int`, `str`
+                or `datetime.date`, by field name. Fields not found in the
+                schema have their type guessed from the value.
+            endpoint (str, optional): Endpoint the conversion time is
+                recorded for. Defaults to the one last requested by the
+                current thread.
+        """
+        start = default_timer()
         if isinstance(element, list):
-            safe_element = self._safe_list(element)
+            safe_element = self._safe_list(element, schema)
         elif isinstance(element, dict):
-            safe_element = self._safe_dict(element)
+            safe_element = self._safe_dict(element, schema)
         else:
-            safe_element = self._safe_element(element)
+            safe_element = self._safe_element(element, schema)
+        self._record('safe', start, endpoint)
         return safe_element
 
-    def _safe_dict(self, dictionary):
+    def _safe_dict(self, dictionary, schema=None):
         for key in dictionary.keys():
-            dictionary[key] = self._safe_element(dictionary[key])
+            field_type = schema.get(key) if schema else None
+            if field_type is None:
+                dictionary[key] = self._safe_element(dictionary[key], schema)
+            else:
+                dictionary[key] = self._safe_field(dictionary[key],
+                                                   field_type, schema)
 
         return dictionary
 
-    def _safe_element(self, element):
+    def _safe_element(self, element, schema=None):
+        if isinstance(element, string_types):
+            safe_element = self._safe_string(element)
+        elif isinstance(element, dict):
+            safe_element = self._safe_dict(element, schema)
+        elif isinstance(element, list):
+            safe_element = self._safe_list(element, schema)
+        else:
+            safe_element = self._guess_type(element)
+        return safe_element
+
+    def _safe_list(self, data_list, schema=None):
+        for index, element in enumerate(data_list):
+            data_list[index] = self._safe_element(element, schema)
+        return data_list
+
+    def _safe_field(self, value, field_type, schema):
+        if value is None or isinstance(value, string_types):
+            if not value:
+                return None
+            try:
+                return SCHEMA_CONVERTERS[field_type](value)
+            except ValueError:
+                return self._safe_string(value)
+        elif isinstance(value, list):
+            for index, element in enumerate(value):
+                value[index] = self._safe_field(element, field_type, schema)
+            return value
+        return self._safe_element(value, schema)
+
+    def _safe_string(self, string):
+        """Convert a string with a single regular expression dispatch.
+
+        The result is the same of :meth:`_guess_type`, which is only used
+        for unusual representations, like numbers with unicode digits.
+        """
+        match = TYPED_PATTERN.match(string)
+        if match is not None:
+            try:
+                return TYPED_CONVERTERS[match.lastgroup](string)
+            except ValueError:
+                return self._guess_type(string)
+
+        boolean = BOOLEANS.get(string.lower())
+        if boolean is not None:
+            return boolean
+        elif MAYBE_TYPED_PATTERN.match(string):
+            return self._guess_type(string)
+        return string.strip() if string else None
+
+    def _guess_type(self, element):
         if self._is_digit(element):
             safe_element = int(element)
         elif self._is_float(element):
@@ -132,11 +1008,6 @@ class Client(object):
             safe_element = self._to_date_or_default(element)
         return safe_element
 
-    def _safe_list(self, data_list):
-        for index, element in enumerate(data_list):
-            data_list[index] = self._safe_element(element)
-        return data_list
-
     def _is_float(self, string):
         try:
             float(string)
@@ -170,8 +1041,7 @@ class Client(object):
         for date_format in date_formats.keys():
             try:
                 final_value = datetime.strptime(string, date_format)
-                tz = pytz.timezone('America/Sao_Paulo')
-                final_value = tz.localize(final_value)
+                final_value = TIMEZONE.localize(final_value)
                 if date_formats[date_format]:
                     get_date_type = getattr(final_value,
                                             date_formats[date_format])
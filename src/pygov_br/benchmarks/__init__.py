@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""Performance benchmarks for pygov_br.
+
+Run with ``python -m pygov_br.benchmarks``.
+"""
+import timeit
+
+
+def measure(function, setup=None, repeat=3):
+    """Return the best time, in seconds, of `repeat` calls of `function`.
+
+    If given, `setup` is called before each run and its return value is
+    passed to `function`, so its cost is not measured.
+    """
+    best = None
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        start = timeit.default_timer()
+        if setup:
+            function(argument)
+        else:
+            function()
+        elapsed = timeit.default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""Called with ``python -m pygov_br.benchmarks``: run the benchmarks.
+
+Each endpoint fixture is benchmarked in three steps: XML parsing, type
+conversion by :meth:`pygov_br.base.Client._safe` and the whole client
+method, requests included. Speeches in Rich Text Format are benchmarked
+apart, reading and text extraction separately. Times are printed with the
+throughput in records, or speeches, per second. Results may be saved as
+JSON and compared with the ones of another commit::
+
+    python -m pygov_br.benchmarks --json before.json
+    python -m pygov_br.benchmarks --compare before.json
+"""
+from pygov_br.base import Client, lxml_etree
+from pygov_br.benchmarks import measure
+from pygov_br.benchmarks.fixtures import FixtureAdapter, bodies, proposals
+from pygov_br.benchmarks.fixtures import speech_rtfs, to_xml
+from pygov_br.benchmarks.legacy import BytewiseRtf15Reader, guess_types
+from pygov_br.benchmarks.legacy import parse_from_text, read_rtf_from_file
+from pygov_br.benchmarks.legacy import recursive_dict_from_tree, xhtml_text
+from pygov_br.camara_deputados import schemas
+from pygov_br.camara_deputados.deputy import DeputyClient
+from pygov_br.camara_deputados.proposal import ProposalClient
+from pygov_br.camara_deputados.session import SessionClient, document_text
+from pygov_br.vendor.pyth.plugins.rtf15.reader import Rtf15Reader
+from xml.etree.ElementTree import fromstring
+import argparse
+import copy
+import json
+import platform
+import requests
+
+# Endpoint name: (client class, method name, arguments).
+ENDPOINTS = [
+    ('ObterDeputados', DeputyClient, 'all', ()),
+    ('ListarProposicoes', ProposalClient, 'filter', ('PL', 2011)),
+    ('ListarDiscursosPlenario', SessionClient, 'speeches',
+     ('01/01/2016', '31/12/2016')),
+    ('ObterVotacaoProposicao', ProposalClient, 'voting', ('PL', 1992, 2007)),
+    ('ObterAndamento', ProposalClient, 'progress', (3962, 2008, 'PL')),
+]
+
+
+def make_client(client_class, adapter, parser):
+    session = requests.Session()
+    session.mount('http://', adapter)
+    return client_class(session=session, parser=parser)
+
+
+def unsafe_call(client, method, args):
+    """Call a client method, returning its arguments to `_safe` instead."""
+    calls = []
+
+    def capture(element, schema=None):
+        calls.append((element, schema))
+        return element
+
+    client._safe = capture
+    try:
+        getattr(client, method)(*args)
+    finally:
+        del client._safe
+    return calls[-1]
+
+
+def endpoint_benchmarks(parser, repeat):
+    content = bodies()
+    adapter = FixtureAdapter(content)
+    results = []
+    for endpoint, client_class, method, args in ENDPOINTS:
+        client = make_client(client_class, adapter, parser)
+        body = content[endpoint].encode('utf-8')
+        element, schema = unsafe_call(client, method, args)
+        records = len(element) if isinstance(element, list) else None
+        results.append(('{0}: parse'.format(endpoint), measure(
+            lambda: client._xml_to_dict(body), repeat=repeat), records))
+        results.append(('{0}: _safe'.format(endpoint), measure(
+            lambda data: client._safe(data, schema),
+            lambda: copy.deepcopy(element), repeat=repeat), records))
+        results.append(('{0}: end to end'.format(endpoint), measure(
+            lambda: getattr(client, method)(*args), repeat=repeat),
+            records))
+    return results
+
+
+def micro_benchmarks(parser, repeat):
+    client = Client('http://localhost/', parser=parser)
+    records = proposals()
+
+    def setup():
+        return copy.deepcopy(records)
+
+    content = to_xml('proposicoes', 'proposicao', records).encode('utf-8')
+    root = fromstring(content)
+    parsers = ['etree'] if lxml_etree is None else ['etree', 'lxml']
+    results = [('parse: etree from text', measure(
+        lambda: parse_from_text(content), repeat=repeat))]
+    for name in parsers:
+        parser_client = Client('http://localhost/', parser=name)
+        results.append(('parse: ' + name, measure(
+            lambda: parser_client._parse(content), repeat=repeat)))
+
+    results += [
+        ('xml: _make_dict_from_tree', measure(
+            lambda: client._make_dict_from_tree(root), repeat=repeat)),
+        ('xml: recursive', measure(
+            lambda: recursive_dict_from_tree(root, {}), repeat=repeat)),
+        ('coercion: _safe', measure(client._safe, setup, repeat=repeat)),
+        ('coercion: _safe with schema', measure(
+            lambda data: client._safe(data, schemas.PROPOSALS), setup,
+            repeat=repeat)),
+        ('coercion: _guess_type', measure(
+            lambda data: guess_types(client, data), setup, repeat=repeat)),
+    ]
+    return [(name, elapsed, len(records)) for name, elapsed in results]
+
+
+def rtf_benchmarks(repeat):
+    speeches = speech_rtfs()
+    documents = [Rtf15Reader.read(speech) for speech in speeches]
+    results = [
+        ('rtf: read from TemporaryFile', measure(
+            lambda: [read_rtf_from_file(speech) for speech in speeches],
+            repeat=repeat)),
+        ('rtf: read a byte at a time', measure(
+            lambda: [BytewiseRtf15Reader.read(speech) for speech in speeches],
+            repeat=repeat)),
+        ('rtf: read', measure(
+            lambda: [Rtf15Reader.read(speech) for speech in speeches],
+            repeat=repeat)),
+        ('rtf: xhtml and BeautifulSoup', measure(
+            lambda: [xhtml_text(doc) for doc in documents], repeat=repeat)),
+        ('rtf: document_text', measure(
+            lambda: [document_text(doc) for doc in documents],
+            repeat=repeat)),
+    ]
+    return [(name, elapsed, len(speeches)) for name, elapsed in results]
+
+
+def get_parser():
+    parser = argparse.ArgumentParser('python -m pygov_br.benchmarks')
+    parser.add_argument('--parser', choices=['etree', 'lxml'],
+                        help='XML parser backend. Defaults to the fastest.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs of each benchmark. The best is kept.')
+    parser.add_argument('--json', metavar='PATH',
+                        help='Save the results as JSON.')
+    parser.add_argument('--compare', metavar='PATH',
+                        help='Compare with results saved as JSON.')
+    return parser
+
+
+def main(args=None):
+    args = get_parser().parse_args(args)
+    parser = Client('http://localhost/', parser=args.parser).parser.name
+    results = (endpoint_benchmarks(parser, args.repeat) +
+               micro_benchmarks(parser, args.repeat) +
+               rtf_benchmarks(args.repeat))
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as results_file:
+            baseline = json.load(results_file)['results']
+
+    for name, elapsed, records in results:
+        line = '{0:<40} {1:>10.2f} ms'.format(name, elapsed * 1000)
+        if records:
+            line += ' {0:>12,.0f} records/s'.format(records / elapsed)
+        elif name in baseline:
+            line += ' ' * 22
+        if name in baseline:
+            line += '  {0:>6.2f}x'.format(baseline[name] / elapsed)
+        print(line)
+
+    if args.json:
+        with open(args.json, 'w') as results_file:
+            json.dump({
+                'python': platform.python_version(),
+                'parser': parser,
+                'repeat': args.repeat,
+                'results': dict((name, elapsed)
+                                for name, elapsed, _ in results),
+                'records': dict((name, records)
+                                for name, _, records in results),
+            }, results_file, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,456 @@
+# -*- coding: utf-8 -*-
+"""Synthetic responses shaped like the Câmara dos Deputados webservices.
+
+Sizes default to the ones of large real responses, like the 513 deputies of
+`ObterDeputados` or a year of `ListarProposicoes`.
+"""
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from xml.sax.saxutils import escape, quoteattr
+import io
+import random
+
+PROPOSAL_TYPES = ['PL', 'PEC', 'MPV', 'REQ', 'PDC', 'INC', 'RIC', 'SIT']
+PARTIES = ['PT', 'PMDB', 'PSDB', 'PP', 'PSD', 'PR', 'PSB', 'DEM', 'PDT']
+REGIONS = ['SP', 'RJ', 'MG', 'BA', 'RS', 'PR', 'PE', 'CE', 'PA', 'MA']
+
+
+def proposals(count=5000, seed=0):
+    """Build `count` proposals as returned by `ListarProposicoes`.
+
+    Leaf values are strings, as they are after the XML conversion and
+    before :meth:`pygov_br.base.Client._safe`.
+    """
+    generator = random.Random(seed)
+    records = []
+    for index in range(count):
+        year = str(generator.randint(1990, 2017))
+        number = str(generator.randint(1, 9999))
+        proposal_type = generator.choice(PROPOSAL_TYPES)
+        records.append({
+            'id': str(400000 + index),
+            'nome': '{0} {1}/{2}'.format(proposal_type, number, year),
+            'tipoProposicao': {
+                'id': str(generator.randint(100, 999)),
+                'sigla': proposal_type,
+                'nome': 'Projeto de Lei',
+            },
+            'numero': number,
+            'ano': year,
+            'orgaoNumerador': {
+                'id': str(generator.randint(100, 999)),
+                'sigla': 'PLEN',
+                'nome': 'PLENÁRIO',
+            },
+            'datApresentacao': '{0:02d}/{1:02d}/{2} {3:02d}:{4:02d}'.format(
+                generator.randint(1, 28), generator.randint(1, 12), year,
+                generator.randint(0, 23), generator.randint(0, 59)),
+            'txtEmenta': 'Altera a Lei nº {0}, de {1} de março de {2}, '
+                         'para dispor sobre o tema.'.format(
+                             generator.randint(1000, 13000),
+                             generator.randint(1, 28), year),
+            'txtExplicacaoEmenta': None,
+            'regime': {
+                'codRegime': str(generator.randint(1, 99)),
+                'txtRegime': 'Ordinária',
+            },
+            'apreciacao': {
+                'id': str(generator.randint(1, 9)),
+                'txtApreciacao': 'Proposição Sujeita à Apreciação do '
+                                 'Plenário',
+            },
+            'autor1': {
+                'txtNomeAutor': 'Deputado {0}'.format(index),
+                'idecadastro': str(generator.randint(70000, 200000)),
+                'codPartido': str(generator.randint(1, 40)),
+                'txtSiglaPartido': generator.choice(PARTIES),
+                'txtSiglaUF': generator.choice(REGIONS),
+            },
+            'qtdAutores': str(generator.randint(1, 20)),
+            'ultimoDespacho': {
+                'datDespacho': '{0:02d}/{1:02d}/{2}'.format(
+                    generator.randint(1, 28), generator.randint(1, 12), year),
+                'txtDespacho': 'Às Comissões de Finanças e Tributação.',
+            },
+            'situacao': {
+                'id': str(generator.randint(900, 1300)),
+                'descricao': 'Aguardando Parecer',
+                'orgao': {
+                    'codOrgaoEstado': str(generator.randint(2000, 6000)),
+                    'siglaOrgaoEstado': 'CFT',
+                },
+                'principal': {
+                    'codProposicaoPrincipal': '0',
+                    'proposicaoPrincipal': None,
+                },
+            },
+            'indGenero': 'o',
+            'qtdOrgaosComEstado': str(generator.randint(1, 5)),
+        })
+    return records
+
+
+def deputies(count=513, seed=0):
+    """Build `count` deputies as returned by `ObterDeputados`."""
+    generator = random.Random(seed)
+    records = []
+    for index in range(count):
+        ide = str(70000 + index)
+        records.append({
+            'ideCadastro': ide,
+            'codOrcamento': str(generator.randint(1000, 3000)),
+            'condicao': generator.choice(['Titular', 'Suplente']),
+            'matricula': str(generator.randint(1, 600)),
+            'idParlamentar': str(generator.randint(5000000, 6000000)),
+            'nome': 'NOME CIVIL DO DEPUTADO {0}'.format(index),
+            'nomeParlamentar': 'DEPUTADO {0}'.format(index),
+            'urlFoto': 'http://www.camara.gov.br/internet/deputado/'
+                       'bandep/{0}.jpg'.format(ide),
+            'sexo': generator.choice(['masculino', 'feminino']),
+            'uf': generator.choice(REGIONS),
+            'partido': generator.choice(PARTIES),
+            'gabinete': str(generator.randint(100, 999)),
+            'anexo': str(generator.randint(1, 4)),
+            'fone': '3215-{0}'.format(generator.randint(1000, 9999)),
+            'email': 'dep.deputado{0}@camara.gov.br'.format(index),
+            'comissoes': {'titular': None, 'suplente': None},
+        })
+    return records
+
+
+def speech_sessions(count=40, speeches=50, seed=0):
+    """Build `count` sessions as returned by `ListarDiscursosPlenario`."""
+    generator = random.Random(seed)
+    records = []
+    for index in range(count):
+        day = '{0:02d}/{1:02d}/2016'.format(index % 28 + 1, index % 12 + 1)
+        records.append({
+            'codigo': '{0}.2.55.O'.format(index + 1),
+            'data': day,
+            'numero': str(index + 1),
+            'tipo': 'Ordinária - CD',
+            'fasesSessao': {'faseSessao': {
+                'codigo': 'PE',
+                'descricao': 'Pequeno Expediente',
+                'discursos': {'discurso': [{
+                    'orador': {
+                        'numero': str(number + 1),
+                        'nome': 'DEPUTADO {0}'.format(
+                            generator.randint(1, 513)),
+                        'partido': generator.choice(PARTIES),
+                        'uf': generator.choice(REGIONS),
+                    },
+                    'horaInicioDiscurso': '{0} {1:02d}:{2:02d}'.format(
+                        day, generator.randint(9, 20),
+                        generator.randint(0, 59)),
+                    'txtIndexacao': 'HOMENAGEM, ANIVERSÁRIO, MUNICÍPIO, '
+                                    'EDUCAÇÃO, SAÚDE PÚBLICA.',
+                    'numeroQuarto': str(generator.randint(1, 200)),
+                    'numeroInsercao': str(generator.randint(0, 3)),
+                    'sumario': 'Comentários sobre a situação da saúde '
+                               'pública no Estado e a votação da proposta '
+                               'de emenda à Constituição.',
+                } for number in range(speeches)]},
+            }},
+        })
+    return records
+
+
+def progress(count=300, seed=0):
+    """Build the body of `ObterAndamento` with `count` progress steps."""
+    generator = random.Random(seed)
+    steps = [{
+        'data': '{0:02d}/{1:02d}/{2}'.format(
+            generator.randint(1, 28), generator.randint(1, 12),
+            generator.randint(2008, 2016)),
+        'ordemDeTramitacao': str(count - index),
+        'codOrgao': str(generator.randint(1, 6000)),
+        'orgao': generator.choice(['MESA', 'PLEN', 'CCJC', 'CFT']),
+        'descricao': 'Apresentação do Parecer do Relator, Dep. Deputado '
+                     '{0}, pela aprovação.'.format(index),
+        'inteiroTeor': None,
+    } for index in range(count)]
+    parts = ['<proposicao tipo="PL" numero="3962" ano="2008">']
+    _write_element(parts, 'idProposicao', '408406')
+    _write_element(parts, 'situacao', 'Aguardando Deliberação')
+    _write_element(parts, 'ementa', 'Dispõe sobre a previdência.')
+    _write_element(parts, 'ultimaAcao', {'tramitacao': steps[0]})
+    _write_element(parts, 'andamento', {'tramitacao': steps})
+    parts.append('</proposicao>')
+    return ''.join(parts)
+
+
+def voting(count=10, votes=513, seed=0):
+    """Build the body of `ObterVotacaoProposicao` with `count` votings."""
+    generator = random.Random(seed)
+    parts = ['<proposicao><Sigla>PL</Sigla><Numero>1992</Numero>'
+             '<Ano>2007</Ano><Votacoes>']
+    for index in range(count):
+        parts.append(_tag('Votacao', {
+            'Resumo': 'Aprovada',
+            'Data': '{0}/2/2012'.format(index % 28 + 1),
+            'Hora': '20:{0:02d}'.format(index % 60),
+            'ObjVotacao': 'SUBEMENDA SUBSTITUTIVA GLOBAL DE PLENÁRIO',
+            'codSessao': str(4500 + index),
+        }, close=False))
+        parts.append('<orientacaoBancada>')
+        for party in PARTIES:
+            parts.append(_tag('bancada', {
+                'Sigla': party,
+                'orientacao': generator.choice(['Sim ', 'Não ', 'Liberado']),
+            }))
+        parts.append('</orientacaoBancada><votos>')
+        for vote in range(votes):
+            parts.append(_tag('Deputado', {
+                'Nome': 'Deputado {0}'.format(vote),
+                'ideCadastro': str(70000 + vote),
+                'Partido': generator.choice(PARTIES) + ' ',
+                'UF': generator.choice(REGIONS),
+                'Voto': generator.choice(['Sim ', 'Não ', 'Obstrução ']),
+            }))
+        parts.append('</votos></Votacao>')
+    parts.append('</Votacoes></proposicao>')
+    return ''.join(parts)
+
+
+# Small bodies of the endpoints without a large fixture.
+SPEECH_WORDS = (
+    'Sr. Presidente, Sras. e Srs. Deputados, ocupo esta tribuna para '
+    'registrar a situação da saúde pública no Estado, a votação da '
+    'proposta de emenda à Constituição e a inauguração da nova escola do '
+    'Município, com recursos da União e do Governo estadual.'
+).split()
+
+
+def speech_rtf(paragraphs=60, seed=0):
+    """Build a speech in Rich Text Format, as in `discursoRTFBase64`.
+
+    Speeches have the header, paragraph formatting and escaped accented
+    characters of the real ones. The default size is about 30 KB.
+    """
+    generator = random.Random(seed)
+    parts = [
+        b'{\\rtf1\\ansi\\ansicpg1252\\deff0\\deflang1046'
+        b'{\\fonttbl{\\f0\\fswiss\\fprq2\\fcharset0 Arial;}}\r\n'
+        b'{\\colortbl ;\\red0\\green0\\blue0;}\r\n'
+        b'\\viewkind4\\uc1\\pard\\sl480\\slmult1\\qj\\f0\\fs24\\tab'
+        b'\\b O SR. DEPUTADO \\b0 (PT-SP. Sem revis\\\'e3o do orador.) - ',
+    ]
+    for _ in range(paragraphs):
+        words = [generator.choice(SPEECH_WORDS) for _ in range(80)]
+        parts.append(_rtf_escape(' '.join(words)))
+        parts.append(b'\\par\r\n\\tab ')
+    parts.append(b'}')
+    return b''.join(parts)
+
+
+def speech_rtfs(count=20, paragraphs=60, seed=0):
+    """Build `count` speeches with :func:`speech_rtf`."""
+    return [speech_rtf(paragraphs, seed + index) for index in range(count)]
+
+
+SMALL_BODIES = {
+    'ObterDetalhesDeputado': (
+        '<Deputados><Deputado><numLegislatura>55</numLegislatura>'
+        '<nomeParlamentarAtual>DEPUTADO 1</nomeParlamentarAtual>'
+        '<partidoAtual><sigla>PSD</sigla></partidoAtual>'
+        '<comissoes><comissao><siglaComissao>CCJC</siglaComissao>'
+        '</comissao></comissoes></Deputado></Deputados>'),
+    'ObterPartidosCD': (
+        '<partidos><partido><idPartido>PT</idPartido>'
+        '<siglaPartido>PT</siglaPartido>'
+        '<nomePartido>Partido dos Trabalhadores</nomePartido>'
+        '<dataCriacao>10/02/1980</dataCriacao><dataExtincao/></partido>'
+        '</partidos>'),
+    'ObterPartidosBlocoCD': (
+        '<blocos><bloco><idBloco>1</idBloco><nomeBloco>PV, PPS</nomeBloco>'
+        '<Partidos><partido><idPartido>PV</idPartido></partido>'
+        '<partido><idPartido>PPS</idPartido></partido></Partidos></bloco>'
+        '</blocos>'),
+    'ObterLideresBancadas': (
+        '<bancadas><bancada sigla="PT" nome="Partido dos Trabalhadores">'
+        '<lider><ideCadastro>70001</ideCadastro><nome>DEPUTADO 1</nome>'
+        '<partido>PT</partido><uf>SP</uf></lider>'
+        '<vice_lider><ideCadastro>70002</ideCadastro><nome>DEPUTADO 2'
+        '</nome><partido>PT</partido><uf>RJ</uf></vice_lider></bancada>'
+        '</bancadas>'),
+    'ListarPresencasParlamentar': (
+        '<parlamentar><legislatura>55</legislatura><diasDeSessoes2><dia>'
+        '<data>10/10/2016</data><frequencianoDia>Presença</frequencianoDia>'
+        '<sessoes><sessao><frequencia>Presença</frequencia></sessao>'
+        '</sessoes></dia></diasDeSessoes2></parlamentar>'),
+    'ObterOrgaos': (
+        '<orgaos><orgao id="2001" idTipodeOrgao="2" sigla="CCJC" '
+        'descricao="Comissão de Constituição e Justiça e de Cidadania"/>'
+        '</orgaos>'),
+    'ListarCargosOrgaosLegislativosCD': (
+        '<cargosOrgaos><cargo id="1" descricao="Presidente"/>'
+        '<cargo id="2" descricao="1º Vice-Presidente"/></cargosOrgaos>'),
+    'ListarTiposOrgaos': (
+        '<tipoOrgaos><tipoOrgao id="2" descricao="Comissão Permanente"/>'
+        '</tipoOrgaos>'),
+    'ObterMembrosOrgao': (
+        '<orgao nome="Comissão de Defesa do Consumidor"><membros>'
+        '<Presidente><ideCadastro>70001</ideCadastro><nome>DEPUTADO 1'
+        '</nome></Presidente><membro><ideCadastro>70002</ideCadastro>'
+        '<nome>DEPUTADO 2</nome></membro></membros></orgao>'),
+    'ObterPauta': (
+        '<pauta orgao="CDC" dataInicial="01/01/2016" dataFinal="30/04/2016">'
+        '<reuniao><codReuniao>1</codReuniao><comissao>CDC</comissao>'
+        '<data>10/03/2016</data><horario>14:30</horario><proposicoes>'
+        '<proposicao><sigla>PL 1762/2011</sigla></proposicao>'
+        '</proposicoes></reuniao></pauta>'),
+    'ObterEmendasSubstitutivoRedacaoFinal': (
+        '<Proposicao tipo="PL" Numero="3962" Ano="2008"><Substitutivos>'
+        '<Substitutivo CodProposicao="439782" Descricao="SBT 1"/>'
+        '</Substitutivos><RedacoesFinais><RedacaoFinal '
+        'CodProposicao="440524" Descricao="RDF 1"/></RedacoesFinais>'
+        '<Emendas><Emenda CodProposicao="413968" Descricao="EMC 1/2008"/>'
+        '</Emendas></Proposicao>'),
+    'ObterIntegraComissoesRelator': (
+        '<proposicao tipo="PL" numero="3962" ano="2008"><comissoes>'
+        '<comissao nome="Comissão de Trabalho" sigla="CT" codOrgao="2015">'
+        '<tipoAnalise>Mérito</tipoAnalise><relator>DEPUTADO 1</relator>'
+        '<dataParecer>24/06/2009 10:00</dataParecer></comissao>'
+        '</comissoes></proposicao>'),
+    'ObterProposicao': (
+        '<proposicao tipo="PL " numero="3962" ano="2008">'
+        '<nomeProposicao>PL 3962/2008</nomeProposicao>'
+        '<idProposicao>408406</idProposicao><Autor>Poder Executivo</Autor>'
+        '<DataApresentacao>10/10/2008</DataApresentacao></proposicao>'),
+    'ObterProposicaoPorID': (
+        '<proposicao tipo="PL " numero="3962" ano="2008">'
+        '<nomeProposicao>PL 3962/2008</nomeProposicao>'
+        '<idProposicao>408406</idProposicao><Autor>Poder Executivo</Autor>'
+        '<DataApresentacao>10/10/2008</DataApresentacao></proposicao>'),
+    'ListarProposicoesVotadasEmPlenario': (
+        '<proposicoes><proposicao><codProposicao>14245</codProposicao>'
+        '<nomeProposicao>PEC 3/1999</nomeProposicao>'
+        '<dataVotacao>10/02/2016</dataVotacao></proposicao></proposicoes>'),
+    'ListarProposicoesTramitadasNoPeriodo': (
+        '<proposicoes><proposicao><codProposicao>590279</codProposicao>'
+        '<tipoProposicao>SIT</tipoProposicao><numero>1</numero>'
+        '<ano>2016</ano><dataAlteracao>10/10/2016 10:00:00</dataAlteracao>'
+        '</proposicao></proposicoes>'),
+    'ListarSiglasTipoProposicao': (
+        '<siglas><sigla tipoSigla="PL" descricao="Projeto de Lei" '
+        'ativa="True" genero="o"/></siglas>'),
+    'ListarTiposAutores': (
+        '<siglas><TipoAutor id="TipoOrgao_11" descricao="Conselho"/>'
+        '</siglas>'),
+    'ListarSituacoesProposicao': (
+        '<situacaoProposicao><situacaoProposicao id="1180" '
+        'descricao="Aguardando Apoiamento" ativa="True"/>'
+        '</situacaoProposicao>'),
+    'obterInteiroTeorDiscursosPlenario': (
+        '<sessao><nome>DEPUTADO 1</nome><partido>PT</partido><uf>SP</uf>'
+        '<horaInicioDiscurso>10/10/2016 10:00</horaInicioDiscurso>'
+        '<discursoRTFBase64>e1xydGYxXGFuc2kgVGhpcyBsaW5lIGlzIHRoZSBkZWZh'
+        'dWx0IHRleHR9</discursoRTFBase64></sessao>'),
+    'ListarPresencasDia': (
+        '<dia><data>10/10/2016</data><legislatura>55</legislatura>'
+        '<parlamentares><parlamentar><nomeParlamentar>DEPUTADO 1'
+        '</nomeParlamentar><sessoesDia><sessaoDia><descricao>ORDINÁRIA 073'
+        '</descricao></sessaoDia></sessoesDia></parlamentar>'
+        '</parlamentares></dia>'),
+    'ListarSituacoesReuniaoSessao': (
+        '<situacaoReuniaoSessao><situacaoReuniao id="1" '
+        'descricao="Não Confirmada "/><situacaoReuniao id="2" '
+        'descricao="Convocada "/></situacaoReuniaoSessao>'),
+}
+
+
+def bodies():
+    """Build the bodies of every endpoint used by the clients, by name.
+
+    The endpoints benchmarked by ``python -m pygov_br.benchmarks`` have large
+    bodies; the other ones are small.
+    """
+    return dict(SMALL_BODIES, **{
+        'ObterDeputados': to_xml('deputados', 'deputado', deputies()),
+        'ListarProposicoes': to_xml('proposicoes', 'proposicao',
+                                    proposals()),
+        'ListarDiscursosPlenario': to_xml('sessoesDiscursos', 'sessao',
+                                          speech_sessions()),
+        'ObterVotacaoProposicao': voting(),
+        'ObterAndamento': progress(),
+    })
+
+
+class FixtureAdapter(BaseAdapter):
+    """Transport adapter answering requests with fixed bodies.
+
+    Mounted on the session of a client, it answers each request with the
+    body of its endpoint, the last segment of the URL path, without any
+    network access.
+
+    Args:
+        bodies (dict): Response bodies, as bytes or text, by endpoint name.
+    """
+
+    def __init__(self, bodies):
+        super(FixtureAdapter, self).__init__()
+        self.bodies = dict(
+            (name, body if isinstance(body, bytes) else body.encode('utf-8'))
+            for name, body in bodies.items())
+
+    def send(self, request, **kwargs):
+        endpoint = request.path_url.split('?')[0].rsplit('/', 1)[-1]
+        response = Response()
+        response.request = request
+        response.url = request.url
+        response.encoding = 'utf-8'
+        response.headers['Content-Type'] = 'text/xml; charset=utf-8'
+        if endpoint in self.bodies:
+            response.status_code = 200
+            response.reason = 'OK'
+            response.raw = io.BytesIO(self.bodies[endpoint])
+        else:
+            response.status_code = 404
+            response.reason = 'Not Found'
+            response.raw = io.BytesIO(b'')
+        return response
+
+    def close(self):
+        pass
+
+
+def to_xml(root_tag, item_tag, records):
+    """Serialize `records` as the webservices do, one element per field."""
+    parts = ['<{0}>'.format(root_tag)]
+    for record in records:
+        _write_element(parts, item_tag, record)
+    parts.append('</{0}>'.format(root_tag))
+    return ''.join(parts)
+
+
+def _write_element(parts, tag, value):
+    if isinstance(value, list):
+        for item in value:
+            _write_element(parts, tag, item)
+    elif isinstance(value, dict):
+        parts.append('<{0}>'.format(tag))
+        for key, child in value.items():
+            _write_element(parts, key, child)
+        parts.append('</{0}>'.format(tag))
+    elif value is None:
+        parts.append('<{0}/>'.format(tag))
+    else:
+        parts.append('<{0}>{1}</{0}>'.format(tag, escape(value)))
+
+
+def _rtf_escape(text):
+    escaped = []
+    for character in text:
+        if ord(character) < 128:
+            escaped.append(character)
+        else:
+            escaped.append("\\'{0:02x}".format(
+                ord(character.encode('cp1252'))))
+    return ''.join(escaped).encode('ascii')
+
+
+def _tag(tag, attributes, close=True):
+    attributes = ''.join(' {0}={1}'.format(name, quoteattr(value))
+                         for name, value in sorted(attributes.items()))
+    return '<{0}{1}{2}>'.format(tag, attributes, '/' if close else '')
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""Former implementations, benchmarked against the current ones.
+
+Each one is kept as it was before being optimized, so the benchmarks, and
+the tests checking that the new implementations give the same results,
+compare against a fixed reference.
+"""
+from pygov_br.vendor.pyth.plugins.rtf15.reader import Group, Rtf15Reader
+from pygov_br.vendor.pyth.plugins.rtf15.reader import _CONTROLCHARS, _DIGITS
+from pygov_br.vendor.pyth.plugins.xhtml.writer import XHTMLWriter
+from bs4 import BeautifulSoup
+from xml.etree.ElementTree import fromstring
+import tempfile
+
+
+def guess_types(client, element):
+    """Type conversion as done before the single dispatch coercion."""
+    if isinstance(element, dict):
+        for key in element.keys():
+            element[key] = guess_types(client, element[key])
+        return element
+    elif isinstance(element, list):
+        return [guess_types(client, value) for value in element]
+    return client._guess_type(element)
+
+
+def recursive_dict_from_tree(tree, accum):
+    """XML conversion, as done before the iterative converter."""
+    if len(tree):
+        accum[tree.tag] = {}
+        for each in tree:
+            result = recursive_dict_from_tree(each, {})
+            if each.tag in accum[tree.tag]:
+                if not isinstance(accum[tree.tag][each.tag], list):
+                    accum[tree.tag][each.tag] = [accum[tree.tag][each.tag]]
+                accum[tree.tag][each.tag].append(result[each.tag])
+            else:
+                accum[tree.tag].update(result)
+    else:
+        accum[tree.tag] = tree.text
+    return accum
+
+
+def parse_from_text(content):
+    """Parsing as done before the parser backends, from the decoded body."""
+    return fromstring(content.decode('utf-8').encode('utf-8'))
+
+
+def xhtml_text(doc):
+    """Text extraction as done before the text visitor."""
+    html = XHTMLWriter.write(doc, pretty=True).read()
+    return BeautifulSoup(html, "html.parser").text.strip()
+
+
+def read_rtf_from_file(content):
+    """RTF reading as done before the in-memory source."""
+    source = tempfile.TemporaryFile()
+    source.write(content)
+    return Rtf15Reader.read(source)
+
+
+class BytewiseRtf15Reader(Rtf15Reader):
+    """RTF reading as done before the bulk tokenizer, a byte at a time."""
+
+    def parse(self):
+        while True:
+            nextbyte = self.source.read(1)
+            if not nextbyte:
+                break
+
+            if nextbyte in b'\r\n':
+                continue
+            if nextbyte == b'{':
+                subGroup = Group(self, self.group, self.charsetTable)
+                self.stack.append(subGroup)
+                subGroup.skip = self.group.skip
+                self.group.flushChars()
+                self.group = subGroup
+            elif nextbyte == b'}':
+                subGroup = self.stack.pop()
+                self.group = self.stack[-1]
+                if self.group.specialMeaning == 'FONT_TABLE':
+                    subGroup.ignore()
+                subGroup.finalize()
+                if subGroup.specialMeaning == 'FONT_TABLE':
+                    self.charsetTable = subGroup.charsetTable
+                self.group.content.append(subGroup)
+            elif self.group.skip:
+                continue
+            elif nextbyte == b'\\':
+                control, digits = self.getControl()
+                self.group.handle(control, digits)
+            else:
+                self.group.char(nextbyte)
+
+    def getControl(self):
+        chars = []
+        digits = []
+        current = chars
+        is_first = True
+        while True:
+            nextbyte = self.source.read(1)
+            if not nextbyte:
+                break
+            if is_first and nextbyte in b'\\{}':
+                chars.append(b'control_symbol')
+                digits.append(nextbyte)
+                break
+            if is_first and nextbyte in b'\r\n':
+                chars.append(b'par')
+                break
+
+            is_first = False
+            if nextbyte == b"'":
+                chars.append(b'ansi_escape')
+                digits.append(self.source.read(2))
+                break
+            if nextbyte == b' ':
+                break
+            if nextbyte not in _CONTROLCHARS:
+                self.source.seek(-1, 1)
+                break
+            if nextbyte in _DIGITS:
+                current = digits
+            current.append(nextbyte)
+
+        return b''.join(chars), b''.join(digits)
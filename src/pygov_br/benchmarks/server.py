@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""Local HTTP server replaying the Câmara dos Deputados webservices.
+
+The server answers every endpoint used by :mod:`pygov_br.camara_deputados`
+with the bodies of :func:`pygov_br.benchmarks.fixtures.bodies`, so clients
+and importers may be load tested without network access. Latency, error
+rate and throughput are configurable::
+
+    server = StubServer(latency=0.05, error_rate=0.01, rate=100)
+    server.start()
+    client = ProposalClient(session=server.session())
+    client.filter('PL', 2011)
+    server.stop()
+
+Clients keep their webservice URLs; the session returned by
+:meth:`StubServer.session` sends their requests to the server instead. To
+load test the importers, replace the clients of
+:data:`pygov_br.camara_deputados.cd` with clients using such a session.
+
+Run with ``python -m pygov_br.benchmarks.server`` to serve on a port.
+"""
+from pygov_br.base import RateLimiter
+from pygov_br.benchmarks import fixtures
+from requests.adapters import HTTPAdapter
+from threading import Lock, Thread
+import argparse
+import random
+import requests
+import sys
+import time
+
+if sys.version_info < (3, 0):  # pragma: no cover
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlsplit
+else:  # pragma: no cover
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlsplit
+
+CHUNK_SIZE = 16384
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Answer requests with the body of their endpoint."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        if server.limiter is not None:
+            server.limiter.acquire()
+        delay, fail = server.draw()
+        if delay:
+            time.sleep(delay)
+
+        endpoint = urlsplit(self.path).path.rsplit('/', 1)[-1].lower()
+        body = server.bodies.get(endpoint)
+        if fail:
+            status, body = server.error_status, b'Stub server error'
+        elif body is None:
+            status, body = 404, b'Unknown endpoint'
+        else:
+            status = 200
+        server.count(status)
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.write_body(body)
+
+    def write_body(self, body):
+        bandwidth = self.server.bandwidth
+        for start in range(0, len(body), CHUNK_SIZE):
+            chunk = body[start:start + CHUNK_SIZE]
+            self.wfile.write(chunk)
+            if bandwidth:
+                time.sleep(len(chunk) / float(bandwidth))
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    """Threaded HTTP server replaying fixture bodies.
+
+    Args:
+        address (tuple, optional): Host and port to listen on. Defaults to a
+            free port of the loopback interface.
+        bodies (dict, optional): Response bodies by endpoint name. Defaults
+            to :func:`pygov_br.benchmarks.fixtures.bodies`.
+        latency (float, optional): Delay, in seconds, before each response.
+        jitter (float, optional): Maximum random delay, in seconds, added to
+            the latency.
+        error_rate (float, optional): Probability, between 0 and 1, of
+            answering a request with `error_status`.
+        error_status (int, optional): Status code of the errors. Defaults to
+            503.
+        rate (float, optional): Maximum number of requests answered per
+            second. Exceeding requests wait. Not limited by default.
+        bandwidth (int, optional): Maximum number of bytes per second sent
+            in each response body. Not limited by default.
+        seed (int, optional): Seed of the random latency and errors.
+        verbose (bool, optional): Whether requests are logged to stderr.
+
+    Attributes:
+        requests (int): Number of requests answered.
+        errors (int): Number of requests answered with `error_status`.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=('127.0.0.1', 0), bodies=None, latency=0,
+                 jitter=0, error_rate=0, error_status=503, rate=None,
+                 bandwidth=None, seed=None, verbose=False):
+        HTTPServer.__init__(self, address, StubRequestHandler)
+        if bodies is None:
+            bodies = fixtures.bodies()
+        self.bodies = self._encode(bodies)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.limiter = RateLimiter(rate) if rate else None
+        self.bandwidth = bandwidth
+        self.verbose = verbose
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL of the server."""
+        host, port = self.server_address[:2]
+        return 'http://{0}:{1}/'.format(host, port)
+
+    def draw(self):
+        """Draw the delay of a response and whether it fails."""
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.error_rate
+        return delay, fail
+
+    def count(self, status):
+        with self._lock:
+            self.requests += 1
+            if status == self.error_status:
+                self.errors += 1
+
+    def start(self):
+        """Serve on a background thread."""
+        self._thread = Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def session(self, **kwargs):
+        """Return a session sending every request to this server."""
+        return stub_session(self.url, **kwargs)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _encode(self, bodies):
+        return dict(
+            (name.lower(),
+             body if isinstance(body, bytes) else body.encode('utf-8'))
+            for name, body in bodies.items())
+
+
+class StubAdapter(HTTPAdapter):
+    """Transport adapter sending requests to another base URL.
+
+    The path and query of the requests are kept, only the scheme and host
+    are replaced.
+    """
+
+    def __init__(self, url, **kwargs):
+        super(StubAdapter, self).__init__(**kwargs)
+        self.url = urlsplit(url)
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = parts._replace(scheme=self.url.scheme,
+                                     netloc=self.url.netloc).geturl()
+        return super(StubAdapter, self).send(request, **kwargs)
+
+
+def stub_session(url, pool_connections=10, pool_maxsize=10):
+    """Return a session sending every request to the server at `url`."""
+    session = requests.Session()
+    adapter = StubAdapter(url, pool_connections=pool_connections,
+                          pool_maxsize=pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_parser():
+    parser = argparse.ArgumentParser('python -m pygov_br.benchmarks.server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0,
+                        help='Delay, in seconds, before each response.')
+    parser.add_argument('--jitter', type=float, default=0,
+                        help='Maximum random delay added to the latency.')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='Probability of answering with an error.')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--rate', type=float,
+                        help='Maximum number of requests per second.')
+    parser.add_argument('--bandwidth', type=int,
+                        help='Maximum bytes per second of each response.')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--quiet', action='store_true',
+                        help='Do not log the requests.')
+    return parser
+
+
+def main(args=None):
+    args = get_parser().parse_args(args)
+    server = StubServer(
+        (args.host, args.port), latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_status=args.error_status,
+        rate=args.rate, bandwidth=args.bandwidth, seed=args.seed,
+        verbose=not args.quiet)
+    print('Serving on {0}'.format(server.url))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
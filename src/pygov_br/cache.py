@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+from collections import namedtuple, OrderedDict
+from threading import Lock
+import sqlite3
+import time
+import zlib
+
+
+class CacheEntry(namedtuple('CacheEntry', ['value', 'expires', 'etag',
+                                           'last_modified'])):
+    """A cached response body and its HTTP validators."""
+
+    @property
+    def fresh(self):
+        return self.expires >= time.time()
+
+
+class BaseCache(object):
+    """Base class to response cache backends.
+
+    Backends store response bodies by key for a number of seconds and keep
+    track of cache hits and misses. Expired entries may be kept, together
+    with their `ETag` and `Last-Modified` validators, so that the client can
+    revalidate them with a conditional request.
+
+    Args:
+        ttl (int, optional): Default time to live of entries, in seconds.
+            Defaults to 300.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._counters_lock = Lock()
+
+    def get(self, key):
+        """Return the value cached for `key`, or None if missing or expired."""
+        entry = self.get_entry(key)
+        if entry is not None and entry.fresh:
+            return entry.value
+        return None
+
+    def get_entry(self, key):
+        """Return the :class:`CacheEntry` of `key`, even if it is expired.
+
+        Returns None if there is no entry for `key`.
+        """
+        entry = self._get(key)
+        with self._counters_lock:
+            if entry is not None and entry.fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry
+
+    def set(self, key, value, ttl=None, etag=None, last_modified=None):
+        """Cache `value` for `ttl` seconds. Defaults to the cache TTL."""
+        if ttl is None:
+            ttl = self.ttl
+        entry = CacheEntry(value, time.time() + ttl, etag, last_modified)
+        self._set(key, entry)
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        self.hits = 0
+        self.misses = 0
+        self._clear()
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, entry):
+        raise NotImplementedError
+
+    def _clear(self):
+        raise NotImplementedError
+
+
+class MemoryCache(BaseCache):
+    """In-memory cache with least recently used eviction.
+
+    Args:
+        max_size (int, optional): Maximum number of entries. Defaults to 128.
+        ttl (int, optional): Default time to live of entries, in seconds.
+            Defaults to 300.
+    """
+
+    def __init__(self, max_size=128, ttl=300):
+        super(MemoryCache, self).__init__(ttl)
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._entries[key] = entry
+            return entry
+
+    def _set(self, key, entry):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskCache(BaseCache):
+    """SQLite cache that persists between runs.
+
+    Response bodies, as bytes, are stored compressed. When the total size of
+    the stored bodies exceeds `max_size`, the least recently used entries are
+    evicted.
+
+    Args:
+        path (str): Path of the SQLite database file.
+        max_size (int, optional): Maximum size, in bytes, of the compressed
+            bodies. Defaults to 256 MiB.
+        ttl (int, optional): Default time to live of entries, in seconds.
+            Defaults to 300.
+    """
+
+    def __init__(self, path, max_size=256 * 1024 * 1024, ttl=300):
+        super(DiskCache, self).__init__(ttl)
+        self.path = path
+        self.max_size = max_size
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, value BLOB, expires REAL, etag TEXT, '
+                'last_modified TEXT, size INTEGER, accessed REAL)'
+            )
+
+    def __len__(self):
+        with self._lock:
+            cursor = self._connection.execute('SELECT COUNT(*) FROM entries')
+            return cursor.fetchone()[0]
+
+    @property
+    def size(self):
+        """Total size, in bytes, of the stored bodies."""
+        with self._lock:
+            return self._size()
+
+    def close(self):
+        """Close the database connection."""
+        self._connection.close()
+
+    def _size(self):
+        cursor = self._connection.execute('SELECT SUM(size) FROM entries')
+        return cursor.fetchone()[0] or 0
+
+    def _get(self, key):
+        with self._lock:
+            cursor = self._connection.execute(
+                'SELECT value, expires, etag, last_modified FROM entries '
+                'WHERE key = ?', (key,)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+
+            with self._connection:
+                self._connection.execute(
+                    'UPDATE entries SET accessed = ? WHERE key = ?',
+                    (time.time(), key)
+                )
+        value = zlib.decompress(bytes(row[0]))
+        return CacheEntry(value, row[1], row[2], row[3])
+
+    def _set(self, key, entry):
+        value = zlib.compress(entry.value)
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, sqlite3.Binary(value), entry.expires, entry.etag,
+                 entry.last_modified, len(value), time.time())
+            )
+            self._evict()
+
+    def _evict(self):
+        excess = self._size() - self.max_size
+        if excess <= 0:
+            return
+
+        cursor = self._connection.execute(
+            'SELECT key, size FROM entries ORDER BY accessed'
+        )
+        keys = []
+        for key, size in cursor.fetchall():
+            if excess <= 0:
+                break
+            keys.append((key,))
+            excess -= size
+        self._connection.executemany('DELETE FROM entries WHERE key = ?', keys)
+
+    def _clear(self):
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM entries')
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""Asyncio clients for Câmara dos Deputados webservices.
+
+Requires Python 3.6+. For example::
+
+    from pygov_br.camara_deputados.aio import AsyncProposalClient
+
+    async def fetch(proposals):
+        async with AsyncProposalClient(max_concurrency=8) as client:
+            return await asyncio.gather(
+                *[client.get(*proposal) for proposal in proposals])
+"""
+from pygov_br.aio import make_async
+from .deputy import DeputyClient
+from .legislative_body import LegislativeBodyClient
+from .proposal import ProposalClient
+from .session import SessionClient
+
+AsyncDeputyClient = make_async(DeputyClient)
+AsyncLegislativeBodyClient = make_async(LegislativeBodyClient)
+AsyncProposalClient = make_async(ProposalClient)
+AsyncSessionClient = make_async(SessionClient)
@@ -1,14 +1,23 @@
 # -*- coding: utf-8 -*-
 from pygov_br.base import Client
-from xml.etree.ElementTree import fromstring, ElementTree
+from pygov_br.camara_deputados import schemas
+from collections import OrderedDict
+from timeit import default_timer
 import datetime
 
 
 class DeputyClient(Client):
 
-    def __init__(self):
+    cache_ttls = {
+        'ObterPartidosCD': 24 * 60 * 60,
+        'ObterPartidosBlocoCD': 24 * 60 * 60,
+        'ObterLideresBancadas': 60 * 60,
+    }
+
+    def __init__(self, **kwargs):
         host = 'http://www.camara.gov.br/SitCamaraWS/Deputados.asmx/'
-        super(DeputyClient, self).__init__(host)
+        super(DeputyClient, self).__init__(host, **kwargs)
+        self._seats = None
 
     def all(self):
         """Fetch all deputies.
@@ -44,7 +53,7 @@ class DeputyClient(Client):
         if isinstance(list_response, dict):
             list_response = [list_response]
 
-        return self._safe(list_response)
+        return self._safe(list_response, schemas.DEPUTIES)
 
     def details(self, deputy_id, legislature=''):
         """Fetch detailed information about a specific deputy.
@@ -93,7 +102,7 @@ class DeputyClient(Client):
                     'idCausaFimExercicio': None,
                     'siglaUFRepresentacao': 'AL',
                     'situacaoExercicio': 'Suplente'}},
-                  'sexo': False,
+                  'sexo': 'F',
                   'situacaoNaLegislaturaAtual': 'Em Exercício',
                   'ufRepresentacaoAtual': 'AL'}, ...]
 
@@ -106,7 +115,7 @@ class DeputyClient(Client):
         if isinstance(list_response, dict):
             list_response = [list_response]
 
-        return self._safe(list_response)
+        return self._safe(list_response, schemas.DEPUTY_DETAILS)
 
     def parties(self):
         """Fetch all parties.
@@ -131,7 +140,7 @@ class DeputyClient(Client):
         if isinstance(list_response, dict):
             list_response = [list_response]
 
-        return self._safe(list_response)
+        return self._safe(list_response, schemas.PARTIES)
 
     def parties_bloc(self, bloc_id='', legislature=''):
         """Fetch all parties bloc.
@@ -168,7 +177,7 @@ class DeputyClient(Client):
         if isinstance(list_response, dict):
             list_response = [list_response]
 
-        return self._safe(list_response)
+        return self._safe(list_response, schemas.PARTIES_BLOC)
 
     def parliamentary_seats(self):
         """Fetch all parliamentary seats.
@@ -182,15 +191,18 @@ class DeputyClient(Client):
         """
         xml_response = self._get('ObterLideresBancadas')
         list_response = self._xml_attributes_to_list(xml_response, 'bancada')
-        return self._safe(list_response)
+        return self._safe(list_response, schemas.PARLIAMENTARY_SEATS)
 
-    def parliamentary_seat_leaders(self, seat_initials):
+    def parliamentary_seat_leaders(self, seat_initials, refresh=False):
         """Fetch parliamentary seat leaders.
 
         List all leaders and vice-leaders of a specific paliamentary seat.
 
         Args:
             seat_initials (str): Parliamentary seat initials identifier.
+            refresh (bool, optional): Whether the seats are fetched again
+                instead of looked up in the ones memoized by
+                :meth:`parliamentary_seats_with_leaders`. Defaults to False.
 
         Returns:
             dict: A dictionary with two keys: 'lider' and 'vice_lider', where
@@ -207,16 +219,55 @@ class DeputyClient(Client):
                                  'uf': 'PR'}, ...]}
 
         """
-        xml_response = self._get('ObterLideresBancadas')
-        element_tree = ElementTree(fromstring(xml_response))
-        seats = element_tree.findall('bancada')
+        seats = self.parliamentary_seats_with_leaders(refresh)
+        seat = seats[seat_initials]
+        return dict((key, value) for key, value in seat.items()
+                    if key not in schemas.PARLIAMENTARY_SEATS)
+
+    def parliamentary_seats_with_leaders(self, refresh=False):
+        """Fetch all parliamentary seats with their leaders.
+
+        The seats are memoized for the time to live of
+        `ObterLideresBancadas` in :attr:`cache_ttls`: until then, the index
+        fetched before is returned without any request. It must not be
+        modified.
+
+        Args:
+            refresh (bool, optional): Whether the seats are fetched again
+                even if the memoized ones are still valid. Defaults to False.
 
-        for seat in seats:
-            # There is better ways to do this, but we want to support python2.6
-            if seat.attrib.get('sigla') == seat_initials:
-                parliamentary_seat = seat
-        dict_response = self._make_dict_from_tree(parliamentary_seat)
-        return self._safe(dict_response['bancada'])
+        Returns:
+            OrderedDict: The parliamentary seats by initials, each with its
+            name, leader and vice-leaders. For example::
+
+                {'PHS': {'sigla': 'PHS',
+                         'nome': 'Partido Humanista da Solidariedade',
+                         'lider': {'ideCadastro': 74558,
+                                   'nome': 'GIVALDO CARIMBÃO',
+                                   'partido': 'PHS',
+                                   'uf': 'AL'},
+                         'vice_lider': [{'ideCadastro': 178929,
+                                         'nome': 'DIEGO GARCIA',
+                                         'partido': 'PHS',
+                                         'uf': 'PR'}, ...]}, ...}
+
+        """
+        seats = self._seats
+        if not refresh and seats is not None and seats[0] > default_timer():
+            return seats[1]
+
+        xml_response = self._get('ObterLideresBancadas')
+        index = OrderedDict()
+        for seat in self._parse(xml_response).findall('bancada'):
+            seat_dict = dict(seat.attrib)
+            leaders = self._make_dict_from_tree(seat)['bancada']
+            if isinstance(leaders, dict):
+                seat_dict.update(leaders)
+            index[seat_dict.get('sigla')] = self._safe(
+                seat_dict, schemas.PARLIAMENTARY_SEAT_LEADERS)
+        ttl = self.cache_ttls['ObterLideresBancadas']
+        self._seats = (default_timer() + ttl, index)
+        return index
 
     def frequency(self, initial_date, final_date, parliamentary_enrollment):
         """Fetch parliamentary frequency.
@@ -260,4 +311,4 @@ class DeputyClient(Client):
         if isinstance(list_response, dict):
             list_response = [list_response]
 
-        return self._safe(list_response)
+        return self._safe(list_response, schemas.DEPUTY_FREQUENCY)
@@ -1,14 +1,20 @@
 # -*- coding: utf-8 -*-
 from pygov_br.base import Client
+from pygov_br.camara_deputados import schemas
 from datetime import datetime
-from xml.etree.ElementTree import fromstring, ElementTree
 
 
 class LegislativeBodyClient(Client):
 
-    def __init__(self):
+    cache_ttls = {
+        'ObterOrgaos': 24 * 60 * 60,
+        'ListarCargosOrgaosLegislativosCD': 24 * 60 * 60,
+        'ListarTiposOrgaos': 24 * 60 * 60,
+    }
+
+    def __init__(self, **kwargs):
         host = 'http://www.camara.leg.br/SitCamaraWS/Orgaos.asmx/'
-        super(LegislativeBodyClient, self).__init__(host)
+        super(LegislativeBodyClient, self).__init__(host, **kwargs)
 
     def all(self):
         """Fetch all legislative bodies.
@@ -28,7 +34,7 @@ class LegislativeBodyClient(Client):
         """
         xml_response = self._get('ObterOrgaos')
         list_response = self._xml_attributes_to_list(xml_response, 'orgao')
-        return self._safe(list_response)
+        return self._safe(list_response, schemas.LEGISLATIVE_BODIES)
 
     def roles(self):
         """Fetch all legislative bodies roles.
@@ -41,7 +47,7 @@ class LegislativeBodyClient(Client):
         """
         xml_response = self._get('ListarCargosOrgaosLegislativosCD')
         list_response = self._xml_attributes_to_list(xml_response, 'cargo')
-        return self._safe(list_response)
+        return self._safe(list_response, schemas.LEGISLATIVE_BODY_ROLES)
 
     def members(self, legislative_body_id):
         """Fetch members of a legislative body.
@@ -85,10 +91,12 @@ class LegislativeBodyClient(Client):
         """
         path = 'ObterMembrosOrgao?IDOrgao={0}'
         xml_response = self._get(path.format(legislative_body_id))
-        element_tree = ElementTree(fromstring(xml_response.encode('utf-8')))
+        element_tree = self._parse(xml_response)
         members = element_tree.find('membros')
         dict_response = self._make_dict_from_tree(members)
-        return self._safe(dict_response['membros'])
+        return self._safe(
+            dict_response['membros'], schemas.LEGISLATIVE_BODY_MEMBERS
+        )
 
     def schedule(self, legislative_body_id, initial_date='', final_date=''):
         """Fetch all scheduled activities of a legislative body.
@@ -148,7 +156,7 @@ class LegislativeBodyClient(Client):
         if isinstance(list_response, dict):
             list_response = [list_response]
 
-        return self._safe(list_response)
+        return self._safe(list_response, schemas.LEGISLATIVE_BODY_SCHEDULE)
 
     def types(self):
         """Fetch all legislative bodies types.
@@ -161,4 +169,4 @@ class LegislativeBodyClient(Client):
         """
         xml_response = self._get('ListarTiposOrgaos')
         list_response = self._xml_attributes_to_list(xml_response, 'tipoOrgao')
-        return self._safe(list_response)
+        return self._safe(list_response, schemas.LEGISLATIVE_BODY_TYPES)
@@ -1,15 +1,39 @@
 # -*- coding: utf-8 -*-
-from pygov_br.base import Client
-from pygov_br.exceptions import MissingParameterError
-from xml.etree.ElementTree import fromstring, ElementTree
-from datetime import datetime
+from pygov_br.base import Client, requests_host
+from pygov_br.camara_deputados import schemas
+from pygov_br.exceptions import ClientServerError, MissingParameterError
+from array import array
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import date, datetime, timedelta
+import requests
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+try:
+    import pandas
+except ImportError:  # pragma: no cover
+    pandas = None
+
+# Votes, in the order of their codes in :meth:`ProposalClient.voting_columns`.
+VOTES = ('Sim', 'Não', 'Abstenção', 'Obstrução', 'Art. 17')
+
+ORGAOS_HOST = 'http://www.camara.leg.br/SitCamaraWS/Orgaos.asmx/'
 
 
 class ProposalClient(Client):
 
-    def __init__(self):
+    cache_ttls = {
+        'ListarSiglasTipoProposicao': 24 * 60 * 60,
+        'ListarTiposAutores': 24 * 60 * 60,
+        'ListarSituacoesProposicao': 24 * 60 * 60,
+    }
+
+    def __init__(self, **kwargs):
         host = 'http://www.camara.gov.br/SitCamaraWS/Proposicoes.asmx/'
-        super(ProposalClient, self).__init__(host)
+        super(ProposalClient, self).__init__(host, **kwargs)
 
     def filter(self, proposal_type='', year='', proposal_number='',
                initial_date='', final_date='', author_name='',
@@ -127,7 +151,7 @@ class ProposalClient(Client):
         if isinstance(list_response, dict):
             list_response = [list_response]
 
-        return self._safe(list_response)
+        return self._safe(list_response, schemas.PROPOSALS)
 
     def get(self, proposal_type, proposal_number, year):
         r"""Fetch detailed proposal.
@@ -178,7 +202,7 @@ class ProposalClient(Client):
         xml_response = self._get(path.format(proposal_type, proposal_number,
                                              year))
         dict_response = self._xml_to_dict(xml_response)
-        return self._safe(dict_response['proposicao'])
+        return self._safe(dict_response['proposicao'], schemas.PROPOSAL)
 
     def get_by_id(self, proposal_id):
         r"""Fetch detailed proposal by id.
@@ -226,7 +250,55 @@ class ProposalClient(Client):
         path = "ObterProposicaoPorID?IdProp={0}"
         xml_response = self._get(path.format(proposal_id))
         dict_response = self._xml_to_dict(xml_response)
-        return self._safe(dict_response['proposicao'])
+        return self._safe(dict_response['proposicao'], schemas.PROPOSAL)
+
+    def get_many(self, proposals, workers=4, ordered=True):
+        """Fetch several detailed proposals concurrently.
+
+        Args:
+            proposals (iterable): Tuples of `(proposal_type, proposal_number,
+                year)`, as expected by :meth:`get`.
+            workers (int, optional): Number of concurrent requests.
+                Defaults to 4.
+            ordered (bool, optional): If True, results are yielded in the
+                input order, otherwise as soon as they are fetched.
+                Defaults to True.
+
+        Yields:
+            BatchResult: A named tuple `(item, result, error)` for each
+            proposal. A failed request does not abort the batch: its `result`
+            is None and `error` contains the raised exception. For example::
+
+                BatchResult(item=('PL', 3962, 2008),
+                            result={'Autor': 'Senado Federal - Serys ' \
+                                             'Slhessarenko', ...},
+                            error=None)
+        """
+        items = [tuple(proposal) for proposal in proposals]
+        for result in self._map(self.get, items, workers=workers,
+                                ordered=ordered):
+            yield result
+
+    def get_by_id_many(self, proposal_ids, workers=4, ordered=True):
+        """Fetch several detailed proposals by id concurrently.
+
+        Args:
+            proposal_ids (iterable): Proposal identifiers.
+            workers (int, optional): Number of concurrent requests.
+                Defaults to 4.
+            ordered (bool, optional): If True, results are yielded in the
+                input order, otherwise as soon as they are fetched.
+                Defaults to True.
+
+        Yields:
+            BatchResult: A named tuple `(item, result, error)` for each
+            proposal, where `item` is a tuple with the proposal id. See
+            :meth:`get_many`.
+        """
+        items = [(proposal_id,) for proposal_id in proposal_ids]
+        for result in self._map(self.get_by_id, items, workers=workers,
+                                ordered=ordered):
+            yield result
 
     def voting(self, proposal_type, proposal_number, year):
         r"""Fetch all votings of a proposal.
@@ -259,25 +331,119 @@ class ProposalClient(Client):
         path = "ObterVotacaoProposicao?tipo={0}&numero={1}&ano={2}"
         xml_response = self._get(path.format(proposal_type, proposal_number,
                                              year))
-        element_tree = ElementTree(fromstring(xml_response.encode('utf-8')))
+        element_tree = self._parse(xml_response)
 
         voting = element_tree.find('Votacoes')
         voting_list = []
-        for child in voting.getchildren():
-            voting_dict = child.attrib
+        for child in voting:
+            voting_dict = dict(child.attrib)
             seat_orientation_list = []
-            for orientation in child.find('orientacaoBancada').getchildren():
-                seat_orientation_list.append(orientation.attrib)
+            for orientation in child.find('orientacaoBancada'):
+                seat_orientation_list.append(dict(orientation.attrib))
             voting_dict['orientacaoBancada'] = seat_orientation_list
 
             votes_list = []
-            for vote in child.find('votos').getchildren():
-                votes_list.append(vote.attrib)
+            for vote in child.find('votos'):
+                votes_list.append(dict(vote.attrib))
             voting_dict['votos'] = votes_list
 
             voting_list.append(voting_dict)
 
-        return self._safe(voting_list)
+        return self._safe(voting_list, schemas.VOTING)
+
+    def voting_columns(self, proposal_type, proposal_number, year,
+                       output='array'):
+        r"""Fetch all votings of a proposal, with votes as columns.
+
+        Works like :meth:`voting`, but the votes of each voting are returned
+        as columns instead of a dictionary per deputy. Votes, parties and
+        regions are encoded as indices of the category lists returned along
+        with the votings, -1 meaning a missing value. Vote codes are the
+        indices of :data:`VOTES`; other votes are appended after them.
+
+        Args:
+            proposal_type (str): Proposal type initials.
+            proposal_number (int): Proposal number.
+            year (int): Proposal's year.
+            output (str, optional): Type of the columns: `'array'` for
+                :class:`array.array`, `'numpy'` for NumPy arrays or `'pandas'`
+                for a DataFrame by voting, with categorical columns. Defaults
+                to `'array'`.
+
+        Returns:
+            dict: The votings and the categories of the votes. Example::
+
+                {'votacoes': [
+                  {'Data': datetime.date(2012, 2, 29),
+                   'Hora': datetime.time(19, 9),
+                   'ObjVotacao': 'DVS - DEM - EMENDA 26',
+                   'Resumo': 'Rejeitada a Emenda nº 26. ...',
+                   'codSessao': 4533,
+                   'orientacaoBancada': [{'Sigla': 'PT',
+                                          'orientacao': 'Não'}, ...],
+                   'votos': {'ideCadastro': array('i', [166401, ...]),
+                             'Voto': array('b', [0, ...]),
+                             'Partido': array('h', [0, ...]),
+                             'UF': array('h', [0, ...])}}, ...],
+                 'Voto': ['Sim', 'Não', 'Abstenção', 'Obstrução', 'Art. 17'],
+                 'Partido': ['PSDB', ...],
+                 'UF': ['MT', ...]}
+
+        Raises:
+            ImportError: If NumPy or pandas is required by `output` and is
+                not installed.
+        """
+        if output not in ('array', 'numpy', 'pandas'):
+            raise ValueError('Unknown output: {0}'.format(output))
+        if output == 'numpy' and numpy is None:
+            raise ImportError('numpy is required by the numpy output')
+        if output == 'pandas' and pandas is None:
+            raise ImportError('pandas is required by the pandas output')
+
+        path = "ObterVotacaoProposicao?tipo={0}&numero={1}&ano={2}"
+        xml_response = self._get(path.format(proposal_type, proposal_number,
+                                             year))
+        element_tree = self._parse(xml_response)
+
+        votes = _Categories(VOTES)
+        parties = _Categories()
+        regions = _Categories()
+        voting_list = []
+        for child in element_tree.find('Votacoes'):
+            voting_dict = self._safe(dict(child.attrib), schemas.VOTING)
+            voting_dict['orientacaoBancada'] = self._safe(
+                [dict(orientation.attrib)
+                 for orientation in child.find('orientacaoBancada')],
+                schemas.VOTING)
+
+            ids = array('i')
+            vote_codes = array('b')
+            party_codes = array('h')
+            region_codes = array('h')
+            for vote in child.find('votos'):
+                deputy_id = vote.get('ideCadastro', '').strip()
+                ids.append(int(deputy_id) if deputy_id else -1)
+                vote_codes.append(votes.code(vote.get('Voto')))
+                party_codes.append(parties.code(vote.get('Partido')))
+                region_codes.append(regions.code(vote.get('UF')))
+            voting_dict['votos'] = {
+                'ideCadastro': ids,
+                'Voto': vote_codes,
+                'Partido': party_codes,
+                'UF': region_codes,
+            }
+            voting_list.append(voting_dict)
+
+        categories = {
+            'Voto': votes.values,
+            'Partido': parties.values,
+            'UF': regions.values,
+        }
+        for voting_dict in voting_list:
+            voting_dict['votos'] = _convert_columns(
+                voting_dict['votos'], categories, output)
+        categories['votacoes'] = voting_list
+        return categories
 
     def voted(self, year, proposal_type=''):
         """Fetch all voted proposals in the year.
@@ -301,7 +467,7 @@ class ProposalClient(Client):
 
         if isinstance(list_response, dict):
             list_response = [list_response]
-        return self._safe(list_response)
+        return self._safe(list_response, schemas.VOTED)
 
     def processed_in_period(self, initial_date, final_date):
         """Fetch all processed proposals in the period.
@@ -336,8 +502,161 @@ class ProposalClient(Client):
 
         if isinstance(list_response, dict):
             list_response = [list_response]
-        return self._safe(list_response)
+        return self._safe(list_response, schemas.PROCESSED_IN_PERIOD)
+
+    def iter_processed_in_period(self, initial_date, final_date):
+        """Stream all processed proposals in the period.
+
+        Works like :meth:`processed_in_period`, but the response is parsed
+        incrementally and proposals are yielded one at a time, so memory usage
+        stays flat regardless of the period length.
+
+        Args:
+            initial_date (str or datetime): Initial date of period. If `str`,
+                must be in the format: `dd/mm/yyyy`.
+            final_date (str or datetime): Final date of period. If `str`,
+                must be in the format: `dd/mm/yyyy`.
+
+        Yields:
+            dict: A proposal that was processed in the period. See
+            :meth:`processed_in_period`.
+        """
+        if isinstance(initial_date, datetime):
+            initial_date = initial_date.strftime('%d/%m/%Y')
+        if isinstance(final_date, datetime):
+            final_date = final_date.strftime('%d/%m/%Y')
+
+        path = 'ListarProposicoesTramitadasNoPeriodo?dtInicio={0}&dtFim={1}'
+        records = self._iter_get(path.format(initial_date, final_date),
+                                 'proposicao')
+        for record in records:
+            yield self._safe(record, schemas.PROCESSED_IN_PERIOD)
+
+    def iter_processed_in_windows(self, initial_date, final_date,
+                                  window_days=30, min_window_days=1,
+                                  max_window_days=365, target_size=1000,
+                                  workers=4, max_pending=None):
+        """Fetch processed proposals of a long period in windows.
+
+        The period is split in windows of days, fetched concurrently. A
+        window whose request times out or fails with a server error is split
+        in halves, and the following windows are shrunk too. Windows are
+        grown while responses have less than half `target_size` proposals,
+        and shrunk when they have more than twice it.
+
+        Args:
+            initial_date (str, date or datetime): Initial date of period. If
+                `str`, must be in the format: `dd/mm/yyyy`.
+            final_date (str, date or datetime): Final date of period. If
+                `str`, must be in the format: `dd/mm/yyyy`.
+            window_days (int, optional): Initial length of windows, in days,
+                at most `max_window_days`. Defaults to 30.
+            min_window_days (int, optional): Minimum length of windows. A
+                failed window of this length raises its error. Defaults to 1.
+            max_window_days (int, optional): Maximum length of windows.
+                Defaults to 365.
+            target_size (int, optional): Desired number of proposals by
+                window. Defaults to 1000.
+            workers (int, optional): Number of concurrent requests.
+                Defaults to 4.
+            max_pending (int, optional): Maximum number of windows fetched
+                or waiting for the previous ones to be yielded. Defaults to
+                twice `workers`.
+
+        Yields:
+            dict: A proposal that was processed in the period, as returned by
+            :meth:`processed_in_period`. Proposals are yielded by processing
+            date, each `codProposicao` only once.
+
+        Raises:
+            ValueError: If a length of windows is less than 1 day, or
+                `max_window_days` is less than `min_window_days`.
+        """
+        if min(window_days, min_window_days) < 1:
+            raise ValueError(
+                "'window_days' and 'min_window_days' must be at least 1.")
+        if max_window_days < min_window_days:
+            raise ValueError(
+                "'max_window_days' must be at least 'min_window_days'.")
+        next_start = _to_date(initial_date)
+        final_date = _to_date(final_date)
+        days = min(window_days, max_window_days)
+        windows = []
+        seen = set()
+        if max_pending is None:
+            max_pending = 2 * workers
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            def submit(start, end):
+                future = executor.submit(self._processed_in_window, start, end)
+                return _Window(start, end, future)
+
+            while True:
+                while (next_start <= final_date and
+                       len(windows) < max(max_pending, 1)):
+                    end = min(next_start + timedelta(days=days - 1),
+                              final_date)
+                    windows.append(submit(next_start, end))
+                    next_start = end + timedelta(days=1)
+                if not windows:
+                    break
+
+                # Windows done but not handled yet need no waiting; other
+                # ones are waited for until one of them is done.
+                if not any(window.records is None and window.future.done()
+                           for window in windows):
+                    wait([window.future for window in windows
+                          if not window.future.done()],
+                         return_when=FIRST_COMPLETED)
+                index = 0
+                while index < len(windows):
+                    window = windows[index]
+                    index += 1
+                    if window.records is not None or not window.future.done():
+                        continue
+                    try:
+                        window.records = window.future.result()
+                    except (requests.Timeout, ClientServerError):
+                        length = (window.end - window.start).days + 1
+                        if length <= min_window_days:
+                            raise
+                        middle = window.start + timedelta(days=length // 2)
+                        windows[index - 1:index] = [
+                            submit(window.start, middle - timedelta(days=1)),
+                            submit(middle, window.end),
+                        ]
+                        index += 1
+                        days = max(min(days, length // 2), min_window_days)
+                        continue
+
+                    if len(window.records) < target_size // 2:
+                        days = min(days * 2, max_window_days)
+                    elif len(window.records) > target_size * 2:
+                        days = max(days // 2, min_window_days)
+
+                while windows and windows[0].records is not None:
+                    records = sorted(windows.pop(0).records,
+                                     key=_processing_date)
+                    for record in records:
+                        code = record.get('codProposicao')
+                        if code is None or code not in seen:
+                            seen.add(code)
+                            yield record
+
+    def _processed_in_window(self, initial_date, final_date):
+        path = 'ListarProposicoesTramitadasNoPeriodo?dtInicio={0}&dtFim={1}'
+        xml_response = self._get(path.format(
+            initial_date.strftime('%d/%m/%Y'),
+            final_date.strftime('%d/%m/%Y')))
+        dict_response = self._xml_to_dict(xml_response)
+        list_response = (dict_response['proposicoes'] or {}).get(
+            'proposicao', [])
+
+        if isinstance(list_response, dict):
+            list_response = [list_response]
+        return self._safe(list_response, schemas.PROCESSED_IN_PERIOD)
 
+    @requests_host(ORGAOS_HOST)
     def progress(self, proposal_number, year, proposal_type='',
                  initial_date='', legislative_body_id=''):
         r"""Fetch the progress of a proposal.
@@ -392,10 +711,11 @@ class ProposalClient(Client):
         xml_response = self._get(
             path.format(proposal_type, proposal_number, year,
                         initial_date, legislative_body_id),
-            host='http://www.camara.leg.br/SitCamaraWS/Orgaos.asmx/')
+            host=ORGAOS_HOST)
         dict_response = self._xml_to_dict(xml_response)
-        return self._safe(dict_response['proposicao'])
+        return self._safe(dict_response['proposicao'], schemas.PROGRESS)
 
+    @requests_host(ORGAOS_HOST)
     def amendments(self, proposal_type, proposal_number, year):
         """Fetch amendments of a proposal.
 
@@ -415,12 +735,13 @@ class ProposalClient(Client):
                'tipo={0}&numero={1}&ano={2}'
         xml_response = self._get(
             path.format(proposal_type, proposal_number, year),
-            host='http://www.camara.leg.br/SitCamaraWS/Orgaos.asmx/')
-        element_tree = ElementTree(fromstring(xml_response.encode('utf-8')))
+            host=ORGAOS_HOST)
+        element_tree = self._parse(xml_response)
 
-        return self._safe(self._tree_attributes_to_list(element_tree,
-                                                        'Emendas'))
+        list_response = self._tree_attributes_to_list(element_tree, 'Emendas')
+        return self._safe(list_response, schemas.AMENDMENTS)
 
+    @requests_host(ORGAOS_HOST)
     def final_wordings(self, proposal_type, proposal_number, year):
         """Fetch final wordings of a proposal.
 
@@ -440,12 +761,14 @@ class ProposalClient(Client):
                'tipo={0}&numero={1}&ano={2}'
         xml_response = self._get(
             path.format(proposal_type, proposal_number, year),
-            host='http://www.camara.leg.br/SitCamaraWS/Orgaos.asmx/')
-        element_tree = ElementTree(fromstring(xml_response))
+            host=ORGAOS_HOST)
+        element_tree = self._parse(xml_response)
 
-        return self._safe(self._tree_attributes_to_list(element_tree,
-                                                        'RedacoesFinais'))
+        list_response = self._tree_attributes_to_list(element_tree,
+                                                      'RedacoesFinais')
+        return self._safe(list_response, schemas.AMENDMENTS)
 
+    @requests_host(ORGAOS_HOST)
     def substitutives(self, proposal_type, proposal_number, year):
         """Fetch substitutives of a proposal.
 
@@ -465,12 +788,14 @@ class ProposalClient(Client):
                'tipo={0}&numero={1}&ano={2}'
         xml_response = self._get(
             path.format(proposal_type, proposal_number, year),
-            host='http://www.camara.leg.br/SitCamaraWS/Orgaos.asmx/')
-        element_tree = ElementTree(fromstring(xml_response))
+            host=ORGAOS_HOST)
+        element_tree = self._parse(xml_response)
 
-        return self._safe(self._tree_attributes_to_list(element_tree,
-                                                        'Substitutivos'))
+        list_response = self._tree_attributes_to_list(element_tree,
+                                                      'Substitutivos')
+        return self._safe(list_response, schemas.AMENDMENTS)
 
+    @requests_host(ORGAOS_HOST)
     def comissions_opinion(self, proposal_type, proposal_number, year):
         r"""Fetch comissions opinion about a proposal.
 
@@ -501,8 +826,8 @@ class ProposalClient(Client):
         path = 'ObterIntegraComissoesRelator?tipo={0}&numero={1}&ano={2}'
         xml_response = self._get(
             path.format(proposal_type, proposal_number, year),
-            host='http://www.camara.leg.br/SitCamaraWS/Orgaos.asmx/')
-        element_tree = ElementTree(fromstring(xml_response.encode('utf-8')))
+            host=ORGAOS_HOST)
+        element_tree = self._parse(xml_response)
         dict_response = self._make_dict_from_tree(
             element_tree.find('comissoes')
         )
@@ -510,7 +835,7 @@ class ProposalClient(Client):
         if isinstance(list_response, dict):
             list_response = [list_response]
 
-        return self._safe(list_response)
+        return self._safe(list_response, schemas.COMISSIONS_OPINION)
 
     def types(self):
         """Fetch all proposal types.
@@ -525,7 +850,7 @@ class ProposalClient(Client):
         """
         xml_response = self._get('ListarSiglasTipoProposicao')
         dict_response = self._xml_attributes_to_list(xml_response, 'sigla')
-        return self._safe(dict_response)
+        return self._safe(dict_response, schemas.PROPOSAL_TYPES)
 
     def author_types(self):
         """Fetch all author types.
@@ -537,7 +862,7 @@ class ProposalClient(Client):
         """
         xml_response = self._get('ListarTiposAutores')
         dict_response = self._xml_attributes_to_list(xml_response, 'TipoAutor')
-        return self._safe(dict_response)
+        return self._safe(dict_response, schemas.AUTHOR_TYPES)
 
     def statuses(self):
         """Fetch all proposal statuses.
@@ -550,4 +875,61 @@ class ProposalClient(Client):
         xml_response = self._get('ListarSituacoesProposicao')
         dict_response = self._xml_attributes_to_list(xml_response,
                                                      'situacaoProposicao')
-        return self._safe(dict_response)
+        return self._safe(dict_response, schemas.PROPOSAL_STATUSES)
+
+
+class _Categories(object):
+    """Codes of the values of a categorical column, in order of arrival."""
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = dict((value, code) for code, value in enumerate(values))
+
+    def code(self, value):
+        value = (value or '').strip()
+        if not value:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def _convert_columns(columns, categories, output):
+    if output == 'array':
+        return columns
+    columns = dict((name, numpy.array(column, dtype=column.typecode))
+                   for name, column in columns.items())
+    if output == 'numpy':
+        return columns
+    for name in categories:
+        columns[name] = pandas.Categorical.from_codes(
+            columns[name], categories=categories[name])
+    return pandas.DataFrame(columns, columns=['ideCadastro', 'Voto',
+                                              'Partido', 'UF'])
+
+
+class _Window(object):
+    """Period fetched by :meth:`ProposalClient.iter_processed_in_windows`."""
+
+    def __init__(self, start, end, future):
+        self.start = start
+        self.end = end
+        self.future = future
+        self.records = None
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    elif isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%d/%m/%Y').date()
+
+
+def _processing_date(record):
+    value = record.get('dataTramitacao')
+    if isinstance(value, datetime):
+        return value.date()
+    return value if isinstance(value, date) else date.min
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""Field types of the Câmara dos Deputados webservices responses.
+
+Each schema maps the name of a field, at any depth of the response, to the
+type of its values. Fields not listed have their type guessed.
+"""
+from datetime import date, datetime, time
+
+DEPUTIES = {
+    'ideCadastro': int,
+    'codOrcamento': int,
+    'condicao': str,
+    'matricula': int,
+    'idParlamentar': int,
+    'nome': str,
+    'nomeParlamentar': str,
+    'urlFoto': str,
+    'sexo': str,
+    'uf': str,
+    'partido': str,
+    'gabinete': int,
+    'anexo': int,
+    'fone': str,
+    'email': str,
+}
+
+DEPUTY_DETAILS = {
+    'numLegislatura': int,
+    'email': str,
+    'nomeProfissao': str,
+    'dataNascimento': date,
+    'dataFalecimento': date,
+    'ufRepresentacaoAtual': str,
+    'situacaoNaLegislaturaAtual': str,
+    'ideCadastro': int,
+    'idParlamentarDeprecated': int,
+    'nomeParlamentarAtual': str,
+    'nomeCivil': str,
+    'sexo': str,
+    'idPartido': str,
+    'sigla': str,
+    'nome': str,
+    'numero': int,
+    'anexo': int,
+    'telefone': str,
+    'idOrgaoLegislativoCD': int,
+    'siglaComissao': str,
+    'nomeComissao': str,
+    'condicaoMembro': str,
+    'dataEntrada': date,
+    'dataSaida': date,
+    'siglaUFRepresentacao': str,
+    'situacaoExercicio': str,
+    'dataInicio': date,
+    'dataFim': date,
+    'idCausaFimExercicio': int,
+    'descricaoCausaFimExercicio': str,
+    'idCadastroParlamentarAnterior': int,
+}
+
+PARTIES = {
+    'idPartido': str,
+    'siglaPartido': str,
+    'nomePartido': str,
+    'dataCriacao': date,
+    'dataExtincao': date,
+}
+
+PARTIES_BLOC = {
+    'idBloco': int,
+    'nomeBloco': str,
+    'siglaBloco': str,
+    'dataCriacaoBloco': date,
+    'dataExtincaoBloco': date,
+    'idPartido': str,
+    'siglaPartido': str,
+    'nomePartido': str,
+    'dataAdesaoPartido': date,
+    'dataDesligamentoPartido': date,
+}
+
+PARLIAMENTARY_SEATS = {
+    'sigla': str,
+    'nome': str,
+}
+
+PARLIAMENTARY_SEAT_LEADERS = {
+    'sigla': str,
+    'nome': str,
+    'ideCadastro': int,
+    'partido': str,
+    'uf': str,
+}
+
+DEPUTY_FREQUENCY = {
+    'data': date,
+    'qtdeSessoes': int,
+    'frequencianoDia': str,
+    'justificativa': str,
+    'descricao': str,
+    'frequencia': str,
+}
+
+LEGISLATIVE_BODIES = {
+    'id': int,
+    'idTipodeOrgao': int,
+    'sigla': str,
+    'descricao': str,
+}
+
+LEGISLATIVE_BODY_ROLES = {
+    'id': int,
+    'descricao': str,
+}
+
+LEGISLATIVE_BODY_MEMBERS = {
+    'ideCadastro': int,
+    'nome': str,
+    'partido': str,
+    'situacao': str,
+    'uf': str,
+}
+
+LEGISLATIVE_BODY_SCHEDULE = {
+    'codReuniao': int,
+    'comissao': str,
+    'data': date,
+    'estado': str,
+    'horario': time,
+    'local': str,
+    'objeto': str,
+    'tipo': str,
+    'tituloReuniao': str,
+    'ementa': str,
+    'idProposicao': int,
+    'numOrdemApreciacao': int,
+    'partidoRelator': str,
+    'relator': str,
+    'resultado': str,
+    'sigla': str,
+    'textoParecerRelator': str,
+    'ufRelator': str,
+}
+
+LEGISLATIVE_BODY_TYPES = {
+    'id': int,
+    'descricao': str,
+}
+
+PROPOSALS = {
+    'id': int,
+    'nome': str,
+    'sigla': str,
+    'numero': int,
+    'ano': int,
+    'datApresentacao': datetime,
+    'txtEmenta': str,
+    'txtExplicacaoEmenta': str,
+    'codRegime': int,
+    'txtRegime': str,
+    'txtApreciacao': str,
+    'txtNomeAutor': str,
+    'idecadastro': int,
+    'codPartido': int,
+    'txtSiglaPartido': str,
+    'txtSiglaUF': str,
+    'qtdAutores': int,
+    'datDespacho': date,
+    'txtDespacho': str,
+    'descricao': str,
+    'codOrgaoEstado': int,
+    'siglaOrgaoEstado': str,
+    'codProposicaoPrincipal': int,
+    'proposicaoPrincipal': str,
+    'indGenero': str,
+    'qtdOrgaosComEstado': int,
+}
+
+PROPOSAL = {
+    'nomeProposicao': str,
+    'idProposicao': int,
+    'idProposicaoPrincipal': int,
+    'nomeProposicaoOrigem': str,
+    'tipoProposicao': str,
+    'tema': str,
+    'Ementa': str,
+    'ExplicacaoEmenta': str,
+    'Autor': str,
+    'ideCadastro': int,
+    'ufAutor': str,
+    'partidoAutor': str,
+    'DataApresentacao': date,
+    'RegimeTramitacao': str,
+    'UltimoDespacho': str,
+    'Apreciacao': str,
+    'Indexacao': str,
+    'Situacao': str,
+    'LinkInteiroTeor': str,
+    'apensadas': str,
+}
+
+VOTING = {
+    'Resumo': str,
+    'Data': date,
+    'Hora': time,
+    'ObjVotacao': str,
+    'codSessao': int,
+    'Sigla': str,
+    'orientacao': str,
+    'Nome': str,
+    'ideCadastro': int,
+    'Partido': str,
+    'UF': str,
+    'Voto': str,
+}
+
+VOTED = {
+    'codProposicao': int,
+    'nomeProposicao': str,
+    'dataVotacao': date,
+}
+
+PROCESSED_IN_PERIOD = {
+    'codProposicao': int,
+    'tipoProposicao': str,
+    'numero': int,
+    'ano': int,
+    'dataAlteracao': datetime,
+    'dataTramitacao': date,
+}
+
+PROGRESS = {
+    'idProposicao': int,
+    'codOrgao': int,
+    'orgao': str,
+    'ordemDeTramitacao': int,
+    'data': date,
+    'descricao': str,
+}
+
+AMENDMENTS = {
+    'CodProposicao': int,
+    'Descricao': str,
+}
+
+COMISSIONS_OPINION = {
+    'dataParecer': datetime,
+    'inteiroTeorParecerComissao': str,
+    'inteiroTeorParecerRelator': str,
+    'parecer': str,
+    'relator': str,
+    'tipoAnalise': str,
+}
+
+PROPOSAL_TYPES = {
+    'tipoSigla': str,
+    'descricao': str,
+    'ativa': bool,
+    'genero': str,
+}
+
+AUTHOR_TYPES = {
+    'id': str,
+    'descricao': str,
+}
+
+PROPOSAL_STATUSES = {
+    'id': int,
+    'descricao': str,
+    'ativa': bool,
+}
+
+SPEECHES = {
+    'codigo': str,
+    'data': date,
+    'numero': int,
+    'tipo': str,
+    'descricao': str,
+    'horaInicioDiscurso': datetime,
+    'numeroInsercao': int,
+    'numeroQuarto': int,
+    'nome': str,
+    'partido': str,
+    'uf': str,
+    'sumario': str,
+    'txtIndexacao': str,
+}
+
+FULL_SPEECH = {
+    'discurso': str,
+    'sumario': str,
+    'horaInicioDiscurso': datetime,
+    'nome': str,
+    'partido': str,
+    'uf': str,
+}
+
+SESSION_FREQUENCY = {
+    'data': date,
+    'legislatura': int,
+    'qtdeSessoesDia': int,
+    'carteiraParlamentar': int,
+    'descricaoFrequenciaDia': str,
+    'justificativa': str,
+    'nomeParlamentar': str,
+    'presencaExterna': int,
+    'siglaPartido': str,
+    'siglaUF': str,
+    'descricao': str,
+    'frequencia': str,
+    'inicio': datetime,
+}
+
+SESSION_STATUSES = {
+    'id': int,
+    'descricao': str,
+}
@@ -1,18 +1,31 @@
 # -*- coding: utf-8 -*-
 from pygov_br.base import Client
+from pygov_br.camara_deputados import schemas
+from pygov_br.vendor.pyth import document
 from pygov_br.vendor.pyth.plugins.rtf15.reader import Rtf15Reader
-from pygov_br.vendor.pyth.plugins.xhtml.writer import XHTMLWriter
 from base64 import b64decode
-from datetime import datetime
-from bs4 import BeautifulSoup
-from tempfile import TemporaryFile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import multiprocessing
+
+# Text properties rendered as tags by the XHTML writer.
+_TAGGED = ('bold', 'italic', 'underline', 'url', 'sub', 'super')
+_ASCII_SPACES = u' \n\t\f\r'
+
+# Fetched and converted on different threads by full_speeches.
+FULL_SPEECH_ENDPOINT = 'obterInteiroTeorDiscursosPlenario'
 
 
 class SessionClient(Client):
 
-    def __init__(self):
+    cache_ttls = {
+        'ListarSituacoesReuniaoSessao': 24 * 60 * 60,
+    }
+
+    def __init__(self, **kwargs):
         host = 'http://www.camara.leg.br/sitcamaraws/SessoesReunioes.asmx/'
-        super(SessionClient, self).__init__(host)
+        super(SessionClient, self).__init__(host, **kwargs)
 
     def speeches(self, initial_date, final_date, session_id='',
                  parliamentary_name='', party_initials='', region=''):
@@ -81,7 +94,73 @@ class SessionClient(Client):
         if isinstance(list_response, dict):
             list_response = [list_response]
 
-        return self._safe(list_response)
+        return self._safe(list_response, schemas.SPEECHES)
+
+    def iter_speeches(self, initial_date, final_date, session_id='',
+                      parliamentary_name='', party_initials='', region='',
+                      chunk_days=None, workers=4):
+        """Stream all speeches in a period.
+
+        Works like :meth:`speeches`, but the response is parsed incrementally
+        and sessions are yielded one at a time, so memory usage stays flat
+        regardless of the period length.
+
+        If `chunk_days` is given, the period is split in chunks of that many
+        days, fetched concurrently by `workers` threads. Sessions are still
+        yielded in date order, each chunk as soon as it and the previous ones
+        are downloaded.
+
+        Args:
+            initial_date (str or datetime): Initial date of period. If `str`,
+                must be in the format: `dd/mm/yyyy`.
+            final_date (str or datetime): Final date of period. If `str`,
+                must be in the format: `dd/mm/yyyy`.
+            session_id (int, optional): Session identifier. Defaults to ''.
+            parliamentary_name (str, optional): A parliamentary name. Defaults
+                to ''.
+            party_initials (str, optional): Party identifier initials. Defaults
+                to ''.
+            region (str, optional): Brazilian region identifier initials.
+                Defaults to ''.
+            chunk_days (int, optional): Number of days fetched by request.
+                Defaults to the whole period in a single request.
+            workers (int, optional): Number of concurrent requests when the
+                period is chunked. Defaults to 4.
+
+        Yields:
+            dict: A session with the speeches made on it. See
+            :meth:`speeches`.
+
+        Raises:
+            ValueError: If `chunk_days` is less than 1.
+        """
+        if chunk_days is not None:
+            filters = (session_id, parliamentary_name, party_initials, region)
+            chunks = [chunk + filters for chunk in _split_period(
+                initial_date, final_date, chunk_days)]
+            results = self._map(lambda *args: list(self.iter_speeches(*args)),
+                                chunks, workers=workers)
+            for result in results:
+                if result.error is not None:
+                    raise result.error
+                for session in result.result:
+                    yield session
+            return
+
+        if isinstance(initial_date, datetime):
+            initial_date = initial_date.strftime('%d/%m/%Y')
+        if isinstance(final_date, datetime):
+            final_date = final_date.strftime('%d/%m/%Y')
+
+        path = "ListarDiscursosPlenario?dataIni={0}&dataFim={1}&" \
+               "codigoSessao={2}&parteNomeParlamentar={3}&" \
+               "siglaPartido={4}&siglaUF={5}"
+        records = self._iter_get(path.format(
+            initial_date, final_date, session_id, parliamentary_name,
+            party_initials, region
+        ), 'sessao')
+        for record in records:
+            yield self._safe(record, schemas.SPEECHES)
 
     def full_speech(self, session_id, speaker_number, quarter, insertion):
         """Fetch full content of a speech.
@@ -120,25 +199,70 @@ class SessionClient(Client):
                  'uf': 'PA'}
 
         """
-        path = "obterInteiroTeorDiscursosPlenario?codSessao={0}" \
+        xml_dict, speech = self._fetch_full_speech(
+            session_id, speaker_number, quarter, insertion)
+        xml_dict['discurso'] = self._extract_text_from_rtf(speech)
+        return self._safe(xml_dict, schemas.FULL_SPEECH)
+
+    def full_speeches(self, speeches, workers=4, processes=None,
+                      max_pending=16):
+        """Fetch full content of many speeches.
+
+        Speeches are fetched by a thread pool while their RTF contents are
+        converted to text by a process pool, so downloads and decoding
+        overlap. At most `max_pending` speeches are fetched or decoded at
+        once, whatever the number of speeches.
+
+        Args:
+            speeches (iterable): Tuples of the arguments of
+                :meth:`full_speech`: session identifier, speaker number,
+                quarter and insertion.
+            workers (int, optional): Number of concurrent requests. Defaults
+                to 4.
+            processes (int, optional): Number of decoding processes. Defaults
+                to the number of CPUs.
+            max_pending (int, optional): Maximum number of speeches being
+                fetched or decoded. Defaults to 16.
+
+        Yields:
+            dict: The full content of each speech, in the order of
+            `speeches`. See :meth:`full_speech`.
+        """
+        speeches = iter(speeches)
+        pending = deque()
+
+        with _decoder_pool(processes) as decoder, \
+                ThreadPoolExecutor(max_workers=workers) as fetcher:
+            def fetch(args):
+                xml_dict, speech = self._fetch_full_speech(*args)
+                return xml_dict, decoder.submit(extract_text_from_rtf, speech)
+
+            def submit_next():
+                for args in speeches:
+                    pending.append(fetcher.submit(fetch, args))
+                    return
+
+            for _ in range(max_pending):
+                submit_next()
+            while pending:
+                xml_dict, text = pending.popleft().result()
+                xml_dict['discurso'] = text.result()
+                submit_next()
+                yield self._safe(xml_dict, schemas.FULL_SPEECH,
+                                 endpoint=FULL_SPEECH_ENDPOINT)
+
+    def _fetch_full_speech(self, session_id, speaker_number, quarter,
+                           insertion):
+        path = FULL_SPEECH_ENDPOINT + "?codSessao={0}" \
                "&numOrador={1}&numQuarto={2}&numInsercao={3}"
         xml_response = self._get(path.format(session_id, speaker_number,
                                              quarter, insertion))
         xml_dict = self._xml_to_dict(xml_response)['sessao']
         speech = b64decode(xml_dict.pop('discursoRTFBase64'))
-        xml_dict['discurso'] = self._extract_text_from_rtf(speech)
-        return self._safe(xml_dict)
+        return xml_dict, speech
 
     def _extract_text_from_rtf(self, rtf_text):
-        try:
-            temp_file = TemporaryFile()
-            temp_file.write(rtf_text)
-            doc = Rtf15Reader.read(temp_file)
-            html = XHTMLWriter.write(doc, pretty=True).read()
-            cleantext = BeautifulSoup(html, "html.parser").text.strip()
-            return cleantext
-        except (UnicodeDecodeError, TypeError):
-            return None
+        return extract_text_from_rtf(rtf_text)
 
     def frequency(self, session_date, legislature='', deputy_enrollment_id='',
                   party_initials='', region=''):
@@ -193,7 +317,7 @@ class SessionClient(Client):
             party_initials, region
         ))
         xml_dict = self._xml_to_dict(xml_response)
-        return self._safe(xml_dict['dia'])
+        return self._safe(xml_dict['dia'], schemas.SESSION_FREQUENCY)
 
     def status(self):
         """Fetch all status for comissions and sessions.
@@ -208,4 +332,107 @@ class SessionClient(Client):
         xml_response = self._get('ListarSituacoesReuniaoSessao')
         list_response = self._xml_attributes_to_list(xml_response,
                                                      'situacaoReuniao')
-        return self._safe(list_response)
+        return self._safe(list_response, schemas.SESSION_STATUSES)
+
+
+def extract_text_from_rtf(rtf_text):
+    """Convert a speech in Rich Text Format to plain text.
+
+    Returns None if the speech can not be decoded.
+    """
+    try:
+        doc = Rtf15Reader.read(rtf_text)
+        return document_text(doc)
+    except (UnicodeDecodeError, TypeError):
+        return None
+
+
+def document_text(doc):
+    """Return the text of a pyth document.
+
+    The text is the one BeautifulSoup reads from the XHTML rendering of the
+    document, without building either: strings are split where the XHTML
+    has tags, and strings made only of spaces are collapsed to a space or a
+    line break.
+    """
+    strings = []
+    current = []
+
+    def flush():
+        string = u''.join(current)
+        del current[:]
+        if not string:
+            return
+        if not string.strip(_ASCII_SPACES):
+            string = u'\n' if u'\n' in string else u' '
+        strings.append(string)
+
+    def paragraph(element):
+        current.append(u'\n')
+        flush()
+        for text in element.content:
+            tagged = any(name in text.properties for name in _TAGGED)
+            if tagged:
+                flush()
+            lines = u''.join(text.content).split(u'\n')
+            current.append(lines[0])
+            for line in lines[1:]:
+                flush()
+                current.append(line)
+            if tagged:
+                flush()
+        flush()
+        current.append(u'\n')
+
+    def elements(content):
+        for element in content:
+            if not isinstance(element, document.List):
+                paragraph(element)
+                continue
+            flush()
+            for entry in element.content:
+                flush()
+                elements(entry.content)
+                flush()
+            flush()
+
+    elements(doc.content)
+    flush()
+    return u''.join(strings).strip()
+
+
+def _decoder_pool(processes):
+    """Return a process pool whose workers are not forked from threads.
+
+    The pool is fed by fetcher threads, and forking a multithreaded process
+    may deadlock the child on a lock held by another thread. Workers are
+    started by a forkserver, or spawned, where the pool accepts a context,
+    and otherwise started at once, before the threads.
+    """
+    try:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+            'forkserver' if 'forkserver' in methods else 'spawn')
+        return ProcessPoolExecutor(max_workers=processes, mp_context=context)
+    except (AttributeError, TypeError):
+        pool = ProcessPoolExecutor(max_workers=processes)
+        pool.submit(int).result()
+        return pool
+
+
+def _split_period(initial_date, final_date, days):
+    """Split a period in chunks of `days` days, as `dd/mm/yyyy` strings."""
+    if days < 1:
+        raise ValueError("'chunk_days' must be at least 1.")
+    start, end = [
+        value.date() if isinstance(value, datetime) else
+        value if isinstance(value, date) else
+        datetime.strptime(value, '%d/%m/%Y').date()
+        for value in (initial_date, final_date)]
+    chunks = []
+    while start <= end:
+        chunk_end = min(start + timedelta(days=days - 1), end)
+        chunks.append((start.strftime('%d/%m/%Y'),
+                       chunk_end.strftime('%d/%m/%Y')))
+        start = chunk_end + timedelta(days=1)
+    return chunks
@@ -83,10 +83,11 @@ class ParliamentarySeatImporter(BaseDataImporter):
         return models.ParliamentarySeat
 
     def get_data(self):
-        return cd.deputies.parliamentary_seats()
+        self.seats = cd.deputies.parliamentary_seats_with_leaders()
+        return list(self.seats.values())
 
     def after_save_object(self, obj):
-        leaders = cd.deputies.parliamentary_seat_leaders(obj.initials)
+        leaders = self.seats[obj.initials]
         leader_data = leaders.get('lider', None)
         if leader_data:
             leader = models.Deputy.objects.get(pk=leader_data['ideCadastro'])
@@ -2,6 +2,49 @@ from pygov_br.django_apps.base import BaseDataImporter
 from pygov_br.django_apps.camara_deputados import models
 from pygov_br.camara_deputados import cd
 
+INITIAL_DATE = '15/01/2016'
+FINAL_DATE = '15/12/2016'
+
+
+def iter_sessions(initial_date=INITIAL_DATE, final_date=FINAL_DATE):
+    """Stream the sessions of a period with their speeches."""
+    return cd.sessions.iter_speeches(initial_date, final_date, chunk_days=30)
+
+
+def session_speeches(session):
+    """Return copies of the speeches of a session tagged with it."""
+    phases = session['fasesSessao']['faseSessao']
+    if not isinstance(phases, list):
+        phases = [phases]
+    speeches_list = []
+    for phase in phases:
+        speeches = phase['discursos']['discurso']
+        if not isinstance(speeches, list):
+            speeches = [speeches]
+        for speech in speeches:
+            speech = dict(speech)
+            speech['codigoSessao'] = session['codigo']
+            speech['faseSessao'] = {
+                'codigo': phase['codigo'],
+                'descricao': phase['descricao']
+            }
+            speeches_list.append(speech)
+    return speeches_list
+
+
+def import_sessions(initial_date=INITIAL_DATE, final_date=FINAL_DATE):
+    """Import the sessions of a period and their speeches.
+
+    Sessions are downloaded once for both importers and each one is saved
+    with its speeches as it arrives, so the period is never held in memory.
+    """
+    session_importer = SessionImporter()
+    speech_importer = SpeechImporter()
+    for session in iter_sessions(initial_date, final_date):
+        session_importer._get_object(session)
+        for speech in session_speeches(session):
+            speech_importer._get_object(speech)
+
 
 class SessionImporter(BaseDataImporter):
 
@@ -13,7 +56,7 @@ class SessionImporter(BaseDataImporter):
     }
 
     def get_data(self):
-        return cd.sessions.speeches('15/01/2016', '15/12/2016')
+        return list(iter_sessions())
 
     def get_model(self):
         return models.Session
@@ -38,38 +81,9 @@ class SpeechImporter(BaseDataImporter):
     }
 
     def get_data(self):
-        sessions = cd.sessions.speeches('15/01/2016', '15/12/2016')
         speeches_list = []
-        for session in sessions:
-            session_code = session['codigo']
-            phases = session['fasesSessao']['faseSessao']
-            if isinstance(phases, list):
-                for phase in phases:
-                    speeches = phase['discursos']['discurso']
-                    for speech in speeches:
-                        speech['codigoSessao'] = session_code
-                        speech['faseSessao'] = {
-                            'codigo': phase['codigo'],
-                            'descricao': phase['descricao']
-                        }
-            else:
-                speeches = phases['discursos']['discurso']
-                if isinstance(speeches, list):
-                    for speech in speeches:
-                        speech['codigoSessao'] = session_code
-                        speech['faseSessao'] = {
-                            'codigo': phases['codigo'],
-                            'descricao': phases['descricao']
-                        }
-                    speeches_list += speeches
-                else:
-                    speech = speeches
-                    speech['codigoSessao'] = session_code
-                    speech['faseSessao'] = {
-                        'codigo': phases['codigo'],
-                        'descricao': phases['descricao']
-                    }
-                    speeches_list.append(speech)
+        for session in iter_sessions():
+            speeches_list += session_speeches(session)
         return speeches_list
 
     def get_model(self):
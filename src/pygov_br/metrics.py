@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""Sinks of the metrics recorded by the clients.
+
+Clients given a sink through their `metrics` argument record, by endpoint
+name, the following metrics:
+
+* ``latency``: seconds spent by each HTTP request, retries being recorded
+  apart. Waits for the rate limiter, the scheduler and between retries are
+  not included.
+* ``bytes``: size of the response body. Not recorded for streamed bodies.
+* ``parse``: seconds spent parsing the XML body to elements.
+* ``to_dict``: seconds spent converting elements to dictionaries.
+* ``safe``: seconds spent converting the strings to Python types.
+
+Parsing and conversions are recorded for the endpoint last requested by
+the thread, or ``'unknown'`` if it did not request any.
+"""
+from bisect import bisect_left
+from threading import Lock
+
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1,
+                2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304,
+                16777216, 67108864)
+
+# Metric name: (Prometheus name, description, default buckets).
+METRICS = {
+    'latency': ('request_latency_seconds',
+                'Time spent sending requests and receiving responses.',
+                TIME_BUCKETS),
+    'bytes': ('response_bytes', 'Size of the response bodies.',
+              SIZE_BUCKETS),
+    'parse': ('parse_seconds', 'Time spent parsing XML bodies.',
+              TIME_BUCKETS),
+    'to_dict': ('to_dict_seconds',
+                'Time spent converting XML elements to dictionaries.',
+                TIME_BUCKETS),
+    'safe': ('safe_seconds',
+             'Time spent converting response strings to Python types.',
+             TIME_BUCKETS),
+}
+
+
+class BaseSink(object):
+    """Base class to metrics sinks."""
+
+    def record(self, endpoint, metric, value):
+        """Record a `value` of `metric` observed for `endpoint`."""
+        raise NotImplementedError
+
+
+class CallbackSink(BaseSink):
+    """Sink that calls ``callback(endpoint, metric, value)`` per value."""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def record(self, endpoint, metric, value):
+        self.callback(endpoint, metric, value)
+
+
+class Histogram(object):
+    """Distribution of the values of a metric.
+
+    Args:
+        buckets (tuple): Sorted upper bounds of the buckets. Values above
+            the last one are counted in an extra, unbounded bucket.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q):
+        """Return the upper bound of the bucket holding the `q` quantile.
+
+        Returns infinity if the quantile is above the last bucket.
+        """
+        rank = q * self.count
+        accumulated = 0
+        for bound, count in zip(self.buckets, self.counts):
+            accumulated += count
+            if accumulated >= rank:
+                return bound
+        return float('inf')
+
+
+class MemorySink(BaseSink):
+    """Sink that keeps a histogram per endpoint and metric.
+
+    Args:
+        buckets (dict, optional): Bucket upper bounds by metric name,
+            overriding the defaults.
+    """
+
+    def __init__(self, buckets=None):
+        self.buckets = dict((name, metric[2])
+                            for name, metric in METRICS.items())
+        self.buckets.update(buckets or {})
+        self.histograms = {}
+        self._lock = Lock()
+
+    def record(self, endpoint, metric, value):
+        key = (endpoint, metric)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = Histogram(self.buckets.get(metric, TIME_BUCKETS))
+                self.histograms[key] = histogram
+            histogram.observe(value)
+
+    def histogram(self, endpoint, metric):
+        """Return the histogram of `metric` for `endpoint`, if any."""
+        return self.histograms.get((endpoint, metric))
+
+    def summary(self):
+        """Return the count, sum and mean of the metrics by endpoint."""
+        summary = {}
+        with self._lock:
+            for (endpoint, metric), histogram in self.histograms.items():
+                summary.setdefault(endpoint, {})[metric] = {
+                    'count': histogram.count,
+                    'sum': histogram.sum,
+                    'mean': histogram.mean,
+                }
+        return summary
+
+    def clear(self):
+        with self._lock:
+            self.histograms.clear()
+
+    def prometheus(self, prefix='pygov_br'):
+        """Export the histograms in the Prometheus text format."""
+        by_metric = {}
+        with self._lock:
+            for (endpoint, metric), histogram in self.histograms.items():
+                by_metric.setdefault(metric, []).append((endpoint, histogram))
+
+        lines = []
+        for metric in sorted(by_metric):
+            name, description = METRICS.get(metric, (metric, metric))[:2]
+            name = '{0}_{1}'.format(prefix, name)
+            lines.append('# HELP {0} {1}'.format(name, description))
+            lines.append('# TYPE {0} histogram'.format(name))
+            histograms = sorted(by_metric[metric],
+                                key=lambda item: str(item[0]))
+            for endpoint, histogram in histograms:
+                label = 'endpoint="{0}"'.format(_escape(str(endpoint)))
+                accumulated = 0
+                bounds = [_format(bound) for bound in histogram.buckets]
+                for bound, count in zip(bounds + ['+Inf'], histogram.counts):
+                    accumulated += count
+                    lines.append('{0}_bucket{{{1},le="{2}"}} {3}'.format(
+                        name, label, bound, accumulated))
+                lines.append('{0}_sum{{{1}}} {2}'.format(
+                    name, label, _format(histogram.sum)))
+                lines.append('{0}_count{{{1}}} {2}'.format(
+                    name, label, histogram.count))
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+def _escape(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format(number):
+    return repr(float(number))
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from pygov_br.camara_deputados import cd
+from pygov_br.camara_deputados.deputy import DeputyClient
 import datetime
 import responses
 
@@ -372,6 +373,48 @@ def test_deputy_parliamentary_seat_leaders():
     assert len(responses.calls) == 1
 
 
+@responses.activate
+def test_deputy_parliamentary_seats_with_leaders():
+    xml_response = """
+    <bancadas>
+        <bancada sigla="PHS" nome="Partido Humanista da Solidariedade">
+            <lider>
+                <ideCadastro>74558</ideCadastro>
+            </lider>
+        </bancada>
+        <bancada sigla="PSL" nome="Partido Social Liberal"/>
+    </bancadas>
+    """
+    expected_dict = {
+        'PHS': {'sigla': 'PHS', 'nome': 'Partido Humanista da Solidariedade',
+                'lider': {'ideCadastro': 74558}},
+        'PSL': {'sigla': 'PSL', 'nome': 'Partido Social Liberal'},
+    }
+    responses.add(
+        responses.GET,
+        'http://www.camara.gov.br/SitCamaraWS/Deputados.asmx/'
+        'ObterLideresBancadas',
+        body=xml_response, status=200)
+    client = DeputyClient()
+    seats = client.parliamentary_seats_with_leaders()
+    assert seats == expected_dict
+    assert list(seats) == ['PHS', 'PSL']
+    assert client.parliamentary_seats_with_leaders() is seats
+    assert client.parliamentary_seat_leaders('PHS') == {
+        'lider': {'ideCadastro': 74558}}
+    assert client.parliamentary_seat_leaders('PSL') == {}
+    assert len(responses.calls) == 1
+
+    refreshed = client.parliamentary_seats_with_leaders(refresh=True)
+    assert refreshed == expected_dict
+    assert refreshed is not seats
+    assert len(responses.calls) == 2
+
+    client._seats = (0, seats)
+    assert client.parliamentary_seats_with_leaders() is not seats
+    assert len(responses.calls) == 3
+
+
 @responses.activate
 def test_deputy_frequency():
     xml_response = """
@@ -390,8 +433,8 @@ def test_deputy_frequency():
     </parlamentar>
     """
     expected_list = [{
-        'frequencianoDia': u'Presen\xc3\xa7a',
-        'sessoes': {'sessao': {'frequencia': u'Presen\xc3\xa7a'}},
+        'frequencianoDia': u'Presen\xe7a',
+        'sessoes': {'sessao': {'frequencia': u'Presen\xe7a'}},
     }]
     responses.add(
         responses.GET,
@@ -437,10 +480,10 @@ def test_deputy_frequency_dict():
     </parlamentar>
     """
     expected_list = [
-        {'frequencianoDia': u'Presen\xc3\xa7a',
-         'sessoes': {'sessao': {'frequencia': u'Presen\xc3\xa7a'}}},
-        {'frequencianoDia': u'Presen\xc3\xa7a',
-         'sessoes': {'sessao': {'frequencia': u'Presen\xc3\xa7a'}}}
+        {'frequencianoDia': u'Presen\xe7a',
+         'sessoes': {'sessao': {'frequencia': u'Presen\xe7a'}}},
+        {'frequencianoDia': u'Presen\xe7a',
+         'sessoes': {'sessao': {'frequencia': u'Presen\xe7a'}}}
     ]
     responses.add(
         responses.GET,
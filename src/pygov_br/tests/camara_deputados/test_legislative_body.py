@@ -30,7 +30,7 @@ def test_legislative_body_roles():
     </cargosOrgaos>
     """
     expected_list = [{'id': 1, 'descricao': 'Presidente'},
-                     {'id': 2, 'descricao': u'1\xc2\xba Vice-Presidente'}]
+                     {'id': 2, 'descricao': u'1º Vice-Presidente'}]
     responses.add(
         responses.GET,
         'http://www.camara.leg.br/SitCamaraWS/Orgaos.asmx/'
@@ -71,7 +71,7 @@ def test_legislative_body_members():
         'PrimeiroVice-Presidente': {'nome': 'Nelson Marchezan Junior'},
         'SegundoVice-Presidente': {'nome': 'Marcos Rotta'},
         'TerceiroVice-Presidente': {'nome': 'Maria Helena'},
-        'membro': [{'nome': u'Ant\xc3\xb4nio J\xc3\xa1come'},
+        'membro': [{'nome': u'Antônio Jácome'},
                    {'nome': 'Celso Russomanno'}]
     }
     responses.add(
@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
 from pygov_br.camara_deputados import cd
-from pygov_br.exceptions import MissingParameterError
+from pygov_br.camara_deputados import proposal
+from pygov_br.camara_deputados.proposal import ProposalClient
+from pygov_br.exceptions import ClientServerError, MissingParameterError
+from array import array
 from datetime import datetime, date, time
+from time import sleep
 import responses
 import pytest
+import re
 
 
 @responses.activate
@@ -48,10 +53,10 @@ def test_proposal_filter():
         {'nome': 'PL 2718/2011',
          'tipoProposicao': {'sigla': 'PL'},
          'orgaoNumerador': {'sigla': 'PLEN'},
-         'regime': {'txtRegime': u'UrgÃªncia'},
-         'apreciacao': {'txtApreciacao': u'ApreciaÃ§Ã£o do PlenÃ¡rio'},
-         'autor1': {'txtNomeAutor': u'JoÃ£o Paulo Cunha'},
-         'ultimoDespacho': {'txtDespacho': u'Sujeita Ã\xa0 ApreciaÃ§Ã£o'},
+         'regime': {'txtRegime': u'Urgência'},
+         'apreciacao': {'txtApreciacao': u'Apreciação do Plenário'},
+         'autor1': {'txtNomeAutor': u'João Paulo Cunha'},
+         'ultimoDespacho': {'txtDespacho': u'Sujeita à Apreciação'},
          'situacao': {'descricao': 'Arquivada',
                       'orgao': {'siglaOrgaoEstado': 'ARQUIVO'},
                       'principal': {'proposicaoPrincipal': 'PL 2473/2011'}}}
@@ -161,20 +166,20 @@ def test_proposal_filter_dict():
         {'nome': 'PL 2718/2011',
          'tipoProposicao': {'sigla': 'PL'},
          'orgaoNumerador': {'sigla': 'PLEN'},
-         'regime': {'txtRegime': u'UrgÃªncia'},
-         'apreciacao': {'txtApreciacao': u'ApreciaÃ§Ã£o do PlenÃ¡rio'},
-         'autor1': {'txtNomeAutor': u'JoÃ£o Paulo Cunha'},
-         'ultimoDespacho': {'txtDespacho': u'Sujeita Ã\xa0 ApreciaÃ§Ã£o'},
+         'regime': {'txtRegime': u'Urgência'},
+         'apreciacao': {'txtApreciacao': u'Apreciação do Plenário'},
+         'autor1': {'txtNomeAutor': u'João Paulo Cunha'},
+         'ultimoDespacho': {'txtDespacho': u'Sujeita à Apreciação'},
          'situacao': {'descricao': 'Arquivada',
                       'orgao': {'siglaOrgaoEstado': 'ARQUIVO'},
                       'principal': {'proposicaoPrincipal': 'PL 2473/2011'}}},
         {'nome': 'PL 2718/2011',
          'tipoProposicao': {'sigla': 'PL'},
          'orgaoNumerador': {'sigla': 'PLEN'},
-         'regime': {'txtRegime': u'UrgÃªncia'},
-         'apreciacao': {'txtApreciacao': u'ApreciaÃ§Ã£o do PlenÃ¡rio'},
-         'autor1': {'txtNomeAutor': u'JoÃ£o Paulo Cunha'},
-         'ultimoDespacho': {'txtDespacho': u'Sujeita Ã\xa0 ApreciaÃ§Ã£o'},
+         'regime': {'txtRegime': u'Urgência'},
+         'apreciacao': {'txtApreciacao': u'Apreciação do Plenário'},
+         'autor1': {'txtNomeAutor': u'João Paulo Cunha'},
+         'ultimoDespacho': {'txtDespacho': u'Sujeita à Apreciação'},
          'situacao': {'descricao': 'Arquivada',
                       'orgao': {'siglaOrgaoEstado': 'ARQUIVO'},
                       'principal': {'proposicaoPrincipal': 'PL 2473/2011'}}},
@@ -211,6 +216,26 @@ def test_proposal_get():
     assert len(responses.calls) == 1
 
 
+@responses.activate
+def test_proposal_get_many():
+    xml_response = """
+    <proposicao tipo="PL " numero="3962" ano="2008">
+        <idProposicao>408406</idProposicao>
+    </proposicao>
+    """
+    responses.add(
+        responses.GET,
+        'http://www.camara.gov.br/SitCamaraWS/Proposicoes.asmx/'
+        'ObterProposicao',
+        body=xml_response, status=200)
+    proposals = [('PL', 3962, 2008), ('PL', 3963, 2008)]
+    results = list(cd.proposals.get_many(proposals, workers=2))
+    assert [result.item for result in results] == proposals
+    assert [result.result for result in results] == [
+        {'idProposicao': 408406}, {'idProposicao': 408406}]
+    assert len(responses.calls) == 2
+
+
 @responses.activate
 def test_proposal_get_by_id():
     xml_response = """
@@ -232,6 +257,23 @@ def test_proposal_get_by_id():
     assert len(responses.calls) == 1
 
 
+@responses.activate
+def test_proposal_get_by_id_many_with_error():
+    url = ('http://www.camara.gov.br/SitCamaraWS/Proposicoes.asmx/'
+           'ObterProposicaoPorID')
+    responses.add(responses.GET, url + '?IdProp=1', status=500,
+                  body='error', match_querystring=True)
+    responses.add(responses.GET, url + '?IdProp=2', status=200,
+                  body='<proposicao><Autor>Teste</Autor></proposicao>',
+                  match_querystring=True)
+    results = list(cd.proposals.get_by_id_many([1, 2], ordered=False))
+    results.sort(key=lambda result: result.item)
+    assert isinstance(results[0].error, ClientServerError)
+    assert results[0].result is None
+    assert results[1].result == {'Autor': 'Teste'}
+    assert results[1].error is None
+
+
 @responses.activate
 def test_proposals_voting():
     xml_response = """
@@ -261,7 +303,7 @@ def test_proposals_voting():
         'Resumo': 'Aprovada',
         'Data': date(2012, 2, 28),
         'Hora': time(20, 26),
-        'ObjVotacao': u'SUBEMENDA SUBSTITUTIVA GLOBAL DE PLENÃ\x81RIO',
+        'ObjVotacao': u'SUBEMENDA SUBSTITUTIVA GLOBAL DE PLENÁRIO',
         'codSessao': 4531,
         'orientacaoBancada': [{'Sigla': 'PT', 'orientacao': 'Sim'},
                               {'Sigla': 'PMDB', 'orientacao': 'Sim'}],
@@ -281,6 +323,84 @@ def test_proposals_voting():
     assert len(responses.calls) == 1
 
 
+VOTING_COLUMNS_XML = """
+<proposicao>
+    <Votacoes>
+        <Votacao Resumo="Aprovada" Data="28/2/2012" Hora="20:26"
+                 ObjVotacao="SUBEMENDA" codSessao="4531">
+        <orientacaoBancada>
+            <bancada Sigla="PT" orientacao="Sim "/>
+        </orientacaoBancada>
+        <votos>
+            <Deputado Nome="Henrique Afonso" ideCadastro="73940"
+                      Partido="PV " UF="AC" Voto="Não "/>
+            <Deputado Nome="Carlos Souza" ideCadastro="73934"
+                      Partido="PSD " UF="" Voto="Presidente "/>
+        </votos>
+        </Votacao>
+        <Votacao Resumo="Rejeitada" Data="29/2/2012" Hora="19:09"
+                 ObjVotacao="DVS" codSessao="4533">
+        <orientacaoBancada/>
+        <votos>
+            <Deputado Nome="Carlos Souza" ideCadastro="73934"
+                      Partido="PSD " UF="AM" Voto="Sim "/>
+        </votos>
+        </Votacao>
+    </Votacoes>
+</proposicao>
+"""
+
+
+@responses.activate
+def test_proposal_voting_columns():
+    responses.add(
+        responses.GET,
+        'http://www.camara.gov.br/SitCamaraWS/Proposicoes.asmx/'
+        'ObterVotacaoProposicao',
+        body=VOTING_COLUMNS_XML, status=200)
+    result = cd.proposals.voting_columns('PL', 1992, 2007)
+    assert result['Voto'] == ['Sim', 'Não', 'Abstenção', 'Obstrução',
+                              'Art. 17', 'Presidente']
+    assert result['Partido'] == ['PV', 'PSD']
+    assert result['UF'] == ['AC', 'AM']
+
+    first, second = result['votacoes']
+    assert first['codSessao'] == 4531
+    assert first['Data'] == date(2012, 2, 28)
+    assert first['orientacaoBancada'] == [{'Sigla': 'PT',
+                                           'orientacao': 'Sim'}]
+    assert first['votos'] == {
+        'ideCadastro': array('i', [73940, 73934]),
+        'Voto': array('b', [1, 5]),
+        'Partido': array('h', [0, 1]),
+        'UF': array('h', [0, -1]),
+    }
+    assert second['orientacaoBancada'] == []
+    assert second['votos']['Partido'] == array('h', [1])
+    assert second['votos']['UF'] == array('h', [1])
+
+
+@responses.activate
+def test_proposal_voting_columns_pandas():
+    pandas = pytest.importorskip('pandas')
+    responses.add(
+        responses.GET,
+        'http://www.camara.gov.br/SitCamaraWS/Proposicoes.asmx/'
+        'ObterVotacaoProposicao',
+        body=VOTING_COLUMNS_XML, status=200)
+    result = cd.proposals.voting_columns('PL', 1992, 2007, output='pandas')
+    frame = result['votacoes'][0]['votos']
+    assert isinstance(frame, pandas.DataFrame)
+    assert list(frame['ideCadastro']) == [73940, 73934]
+    assert list(frame['Voto']) == ['Não', 'Presidente']
+    assert frame['UF'].isnull().tolist() == [False, True]
+
+
+def test_proposal_voting_columns_unknown_output():
+    with pytest.raises(ValueError):
+        cd.proposals.voting_columns('PL', 1992, 2007, output='csv')
+
+
 @responses.activate
 def test_proposal_voted():
     xml_response = """
@@ -377,6 +497,156 @@ def test_proposal_processed_in_period_dict():
     assert len(responses.calls) == 1
 
 
+@responses.activate
+def test_proposal_iter_processed_in_period():
+    xml_response = """
+    <proposicoes>
+        <proposicao>
+            <codProposicao>590279</codProposicao>
+            <tipoProposicao>SIT</tipoProposicao>
+        </proposicao>
+        <proposicao>
+            <codProposicao>590280</codProposicao>
+            <tipoProposicao>MPV</tipoProposicao>
+        </proposicao>
+    </proposicoes>
+    """
+    expected_list = [{'codProposicao': 590279, 'tipoProposicao': 'SIT'},
+                     {'codProposicao': 590280, 'tipoProposicao': 'MPV'}]
+    responses.add(
+        responses.GET,
+        'http://www.camara.gov.br/SitCamaraWS/Proposicoes.asmx/'
+        'ListarProposicoesTramitadasNoPeriodo',
+        body=xml_response, status=200)
+    result = cd.proposals.iter_processed_in_period(
+        initial_date=datetime(2010, 10, 10),
+        final_date='11/10/2010')
+    assert list(result) == expected_list
+    assert len(responses.calls) == 1
+
+
+def processed_in_window_callback(records, calls, failures=()):
+    def callback(request):
+        start, end = [
+            datetime.strptime(value, '%d/%m/%Y').date()
+            for value in re.findall(r'dt\w+=([\d/]+)', request.url)]
+        calls.append((start, end))
+        if (start, end) in failures:
+            return (503, {}, 'Service Unavailable')
+        body = ''.join(
+            '<proposicao><codProposicao>{0}</codProposicao>'
+            '<dataTramitacao>{1:%d/%m/%Y}</dataTramitacao></proposicao>'
+            .format(code, day)
+            for code, day in records if start <= day <= end)
+        return (200, {}, '<proposicoes>{0}</proposicoes>'.format(body))
+    return callback
+
+
+@responses.activate
+def test_proposal_iter_processed_in_windows():
+    records = [(1, date(2010, 1, 3)), (2, date(2010, 1, 1)),
+               (1, date(2010, 1, 9)), (3, date(2010, 1, 7))]
+    calls = []
+    responses.add_callback(
+        responses.GET,
+        'http://www.camara.gov.br/SitCamaraWS/Proposicoes.asmx/'
+        'ListarProposicoesTramitadasNoPeriodo',
+        callback=processed_in_window_callback(records, calls))
+    result = ProposalClient().iter_processed_in_windows(
+        '01/01/2010', date(2010, 1, 10), window_days=5, workers=1,
+        target_size=10)
+    assert list(result) == [
+        {'codProposicao': 2, 'dataTramitacao': date(2010, 1, 1)},
+        {'codProposicao': 1, 'dataTramitacao': date(2010, 1, 3)},
+        {'codProposicao': 3, 'dataTramitacao': date(2010, 1, 7)},
+    ]
+    assert calls == [(date(2010, 1, 1), date(2010, 1, 5)),
+                     (date(2010, 1, 6), date(2010, 1, 10))]
+
+
+@responses.activate
+def test_proposal_iter_processed_in_windows_splits_failures():
+    records = [(1, date(2010, 1, 1)), (2, date(2010, 1, 4))]
+    calls = []
+    responses.add_callback(
+        responses.GET,
+        'http://www.camara.gov.br/SitCamaraWS/Proposicoes.asmx/'
+        'ListarProposicoesTramitadasNoPeriodo',
+        callback=processed_in_window_callback(
+            records, calls, [(date(2010, 1, 1), date(2010, 1, 4))]))
+    result = ProposalClient().iter_processed_in_windows(
+        '01/01/2010', '04/01/2010', window_days=4, workers=2)
+    assert [record['codProposicao'] for record in result] == [1, 2]
+    assert sorted(calls) == [(date(2010, 1, 1), date(2010, 1, 2)),
+                             (date(2010, 1, 1), date(2010, 1, 4)),
+                             (date(2010, 1, 3), date(2010, 1, 4))]
+
+
+@responses.activate
+def test_proposal_iter_processed_in_windows_slow_first_window(monkeypatch):
+    records = [(day, date(2010, 1, day)) for day in range(1, 11)]
+    calls = []
+    in_flight_after_head = []
+    waits = []
+    fetch = processed_in_window_callback(records, calls)
+
+    def counted_wait(*args, **kwargs):
+        waits.append(1)
+        return wait(*args, **kwargs)
+
+    wait = proposal.wait
+    monkeypatch.setattr(proposal, 'wait', counted_wait)
+
+    def callback(request):
+        response = fetch(request)
+        if calls[-1][0] == date(2010, 1, 1):
+            sleep(0.3)
+            in_flight_after_head.append(len(calls))
+        return response
+
+    responses.add_callback(
+        responses.GET,
+        'http://www.camara.gov.br/SitCamaraWS/Proposicoes.asmx/'
+        'ListarProposicoesTramitadasNoPeriodo',
+        callback=callback)
+    result = ProposalClient().iter_processed_in_windows(
+        '01/01/2010', '10/01/2010', window_days=1, max_window_days=1,
+        workers=2, max_pending=3)
+    assert [record['codProposicao'] for record in result] == list(
+        range(1, 11))
+    # Each wait returns when a window is done: there is no busy loop.
+    assert len(waits) <= 10
+    assert in_flight_after_head == [3]
+    assert len(calls) == 10
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'window_days': 0},
+    {'min_window_days': 0},
+    {'min_window_days': 10, 'max_window_days': 5},
+])
+def test_proposal_iter_processed_in_windows_invalid_days(kwargs):
+    result = ProposalClient().iter_processed_in_windows(
+        '01/01/2010', '10/01/2010', **kwargs)
+    with pytest.raises(ValueError):
+        list(result)
+
+
+@responses.activate
+def test_proposal_iter_processed_in_windows_min_window_error():
+    calls = []
+    responses.add_callback(
+        responses.GET,
+        'http://www.camara.gov.br/SitCamaraWS/Proposicoes.asmx/'
+        'ListarProposicoesTramitadasNoPeriodo',
+        callback=processed_in_window_callback(
+            [], calls, [(date(2010, 1, 1), date(2010, 1, 1))]))
+    result = ProposalClient().iter_processed_in_windows(
+        '01/01/2010', '01/01/2010')
+    with pytest.raises(ClientServerError):
+        list(result)
+
+
 @responses.activate
 def test_proposal_progress():
     xml_response = """
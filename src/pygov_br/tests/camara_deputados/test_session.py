@@ -1,7 +1,21 @@
 # -*- coding: utf-8 -*-
+from pygov_br.benchmarks.legacy import BytewiseRtf15Reader
+from pygov_br.benchmarks.fixtures import speech_rtf
 from pygov_br.camara_deputados import cd
+from pygov_br.camara_deputados import session
+from pygov_br.camara_deputados.session import SessionClient, document_text
+from pygov_br.metrics import MemorySink
+from pygov_br.vendor.pyth.document import Document, List, ListEntry
+from pygov_br.vendor.pyth.document import Paragraph, Text
+from pygov_br.vendor.pyth.plugins.rtf15.reader import Rtf15Reader
+from pygov_br.vendor.pyth.plugins.xhtml.writer import XHTMLWriter
+from bs4 import BeautifulSoup
 from datetime import datetime
+import io
+import multiprocessing
+import pytest
 import responses
+import re
 
 
 @responses.activate
@@ -126,6 +140,65 @@ def test_session_speeches_multiple_sessions():
     assert len(responses.calls) == 2
 
 
+@responses.activate
+def test_session_iter_speeches():
+    xml_response = """
+    <sessoesDiscursos>
+        <sessao>
+            <codigo>320.2.54.O</codigo>
+            <numero>2</numero>
+        </sessao>
+        <sessao>
+            <codigo>321.2.54.O</codigo>
+            <numero>3</numero>
+        </sessao>
+    </sessoesDiscursos>
+    """
+    expected_list = [{'codigo': '320.2.54.O', 'numero': 2},
+                     {'codigo': '321.2.54.O', 'numero': 3}]
+    responses.add(
+        responses.GET,
+        'http://www.camara.leg.br/sitcamaraws/SessoesReunioes.asmx/'
+        'ListarDiscursosPlenario',
+        body=xml_response, status=200)
+    result = cd.sessions.iter_speeches('10/10/2010', '10/10/2010')
+    assert list(result) == expected_list
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_session_iter_speeches_chunked():
+    def callback(request):
+        start, end = re.findall(r'data\w+=([\d/]+)', request.url)
+        body = """
+        <sessoesDiscursos>
+            <sessao><codigo>{0}</codigo></sessao>
+            <sessao><codigo>{1}</codigo></sessao>
+        </sessoesDiscursos>
+        """.format(start, end)
+        return (200, {}, body)
+
+    responses.add_callback(
+        responses.GET,
+        'http://www.camara.leg.br/sitcamaraws/SessoesReunioes.asmx/'
+        'ListarDiscursosPlenario',
+        callback=callback)
+    result = cd.sessions.iter_speeches('01/01/2016', datetime(2016, 1, 25),
+                                       chunk_days=10, workers=3)
+    assert [session['codigo'] for session in result] == [
+        '01/01/2016', '10/01/2016', '11/01/2016', '20/01/2016',
+        '21/01/2016', '25/01/2016']
+    assert len(responses.calls) == 3
+
+
+@pytest.mark.parametrize('chunk_days', [0, -1])
+def test_session_iter_speeches_invalid_chunk(chunk_days):
+    result = cd.sessions.iter_speeches('01/01/2016', '25/01/2016',
+                                       chunk_days=chunk_days)
+    with pytest.raises(ValueError):
+        list(result)
+
+
 @responses.activate
 def test_session_full_speech():
     xml_response = """
@@ -149,6 +222,92 @@ def test_session_full_speech():
     assert len(responses.calls) == 1
 
 
+@responses.activate
+def test_session_full_speeches():
+    xml_response = """
+    <sessao>
+        <nome>DUDIMAR PAXIUBA</nome>
+        <discursoRTFBase64>
+            e1xydGYxXGFuc2lcZGVmZjANCntcY29sb3J0Ymw7XHJlZDBcZ3JlZW4wXGJsdWU
+            wO1xyZWQyNTVcZ3JlZW4wXGJsdWUwO30NClRoaXMgbGluZSBpcyB0aGUgZGVmYX
+            VsdCBjb2xvclxsaW5lfQ==
+        </discursoRTFBase64>
+    </sessao>
+    """
+    responses.add(
+        responses.GET,
+        'http://www.camara.leg.br/sitcamaraws/SessoesReunioes.asmx/'
+        'obterInteiroTeorDiscursosPlenario',
+        body=xml_response, status=200)
+    speeches = [('200.10.3', number, 1, 1) for number in range(5)]
+    sink = MemorySink()
+    client = SessionClient(metrics=sink)
+    result = client.full_speeches(speeches, workers=2, processes=2,
+                                  max_pending=3)
+    assert list(result) == [{'nome': 'DUDIMAR PAXIUBA',
+                             'discurso': 'This line is the default color'}] * 5
+    assert len(responses.calls) == 5
+    assert list(sink.summary()) == ['obterInteiroTeorDiscursosPlenario']
+    assert sink.histogram('obterInteiroTeorDiscursosPlenario',
+                          'safe').count == 5
+
+
+def test_session_decoder_pool_without_start_methods(monkeypatch):
+    monkeypatch.delattr(multiprocessing, 'get_all_start_methods')
+    with session._decoder_pool(1) as pool:
+        assert pool.submit(abs, -1).result() == 1
+
+
+def test_session_document_text_matches_xhtml():
+    doc = Document(content=[
+        Paragraph(content=[
+            Text(content=['a \n b']),
+            Text(properties={'bold': True}, content=['  ']),
+            Text(content=[' c & <d>\n\n'])]),
+        List(content=[ListEntry(content=[
+            Paragraph(content=[Text(content=['x'])]),
+            List(content=[ListEntry(content=[
+                Paragraph(content=[
+                    Text(properties={'url': 'u'}, content=['y'])])])])])]),
+        Paragraph(content=[Text(content=[' \t'])]),
+    ])
+    html = XHTMLWriter.write(doc, pretty=True).read()
+    expected = BeautifulSoup(html, 'html.parser').text.strip()
+    assert document_text(doc) == expected
+
+    speech = Rtf15Reader.read(io.BytesIO(speech_rtf(paragraphs=5)))
+    html = XHTMLWriter.write(speech, pretty=True).read()
+    expected = BeautifulSoup(html, 'html.parser').text.strip()
+    assert document_text(speech) == expected
+
+
+def test_session_rtf_reader_sources():
+    content = speech_rtf(paragraphs=2)
+    expected = document_text(Rtf15Reader.read(io.BytesIO(content)))
+    for source in (content, bytearray(content), memoryview(content)):
+        assert document_text(Rtf15Reader.read(source)) == expected
+
+
+def document_structure(element):
+    if isinstance(element, (bytes, type(u''))):
+        return element
+    return (type(element).__name__, sorted(element.properties.items()),
+            [document_structure(item) for item in element.content])
+
+
+def test_session_rtf_reader_matches_bytewise_reader():
+    sources = [speech_rtf(paragraphs=5), (
+        b"{\\rtf1\\ansi\\deff0{\\fonttbl{\\f0\\fswiss Arial;}}"
+        b"{\\*\\generator x\\{y;}\\f0 a\\b bold\\b0\\par\r\n"
+        b"\\u227?b\\uc2\\u227\\'e3\\'e3c \\~ \\tab\\{\\}\\\\ d"
+        b"\\fs24x\\f0'e3 z\\\r\ne\\i it\\i0 {\\field{\\*\\fldinst "
+        b"HYPERLINK \"http://x\"}{\\fldrslt link}} end\\line f}")]
+    for source in sources:
+        expected = BytewiseRtf15Reader.read(source)
+        assert (document_structure(Rtf15Reader.read(source)) ==
+                document_structure(expected))
+
+
 @responses.activate
 def test_session_frequency():
     xml_response = """
@@ -174,8 +333,8 @@ def test_session_frequency():
         'parlamentares': {'parlamentar': {
             'nomeParlamentar': 'Berinho Bantim',
             'sessoesDia': {'sessaoDia': [
-                {'descricao': u'ORDINÃ\x81RIA 073'},
-                {'descricao': u'EXTRAORDINÃ\x81RIA 074'}
+                {'descricao': u'ORDINÁRIA 073'},
+                {'descricao': u'EXTRAORDINÁRIA 074'}
             ]}}}
     }
     responses.add(
@@ -196,7 +355,7 @@ def test_session_status():
         <situacaoReuniao id="2" descricao="Convocada "/>
     </situacaoReuniaoSessao>
     """
-    expected_list = [{'id': 1, 'descricao': u'NÃ£o Confirmada'},
+    expected_list = [{'id': 1, 'descricao': u'Não Confirmada'},
                      {'id': 2, 'descricao': 'Convocada'}]
     responses.add(
         responses.GET,
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+import sys
+
+# Asyncio support uses the syntax of Python 3.6.
+collect_ignore = []
+if sys.version_info < (3, 6):
+    collect_ignore.append('test_aio.py')
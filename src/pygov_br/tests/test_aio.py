@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+from pygov_br.aio import HostLimiter, acquire
+from pygov_br.base import RateLimiter
+from pygov_br.camara_deputados.aio import AsyncProposalClient
+import asyncio
+import inspect
+import pytest
+import threading
+import time
+import responses
+
+TYPES_URL = ('http://www.camara.gov.br/SitCamaraWS/Proposicoes.asmx/'
+             'ListarSiglasTipoProposicao')
+TYPES_XML = """
+<siglas>
+    <sigla tipoSigla="PL" descricao="Projeto de Lei" ativa="True"/>
+</siglas>
+"""
+
+
+def run(coroutine):
+    """Run `coroutine` on a new event loop, as `asyncio.run` of Python 3.7."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_async_client_mirrors_public_methods():
+    client = AsyncProposalClient()
+    assert asyncio.iscoroutinefunction(client.get)
+    assert asyncio.iscoroutinefunction(client.types)
+    assert not asyncio.iscoroutinefunction(client._get)
+    assert inspect.isasyncgenfunction(client.get_many)
+    assert inspect.isasyncgenfunction(client.iter_processed_in_period)
+
+
+def test_host_limiter_by_netloc():
+    limiter = HostLimiter(2)
+    first = limiter.get('http://mock.com/Orgaos.asmx/')
+    second = limiter.get('http://mock.com/Deputados.asmx/')
+    assert first is second
+    assert limiter.get('http://other.com/') is not first
+
+
+def test_acquire_rate_limiter():
+    limiter = RateLimiter(rate=100, burst=1, clock=lambda: 0.0)
+
+    async def take():
+        return await asyncio.gather(*[acquire(limiter) for _ in range(3)])
+
+    delays = sorted(run(take()))
+    assert delays[0] == 0
+    assert delays[2] == pytest.approx(0.02)
+
+
+@responses.activate
+def test_async_client_request():
+    responses.add(responses.GET, TYPES_URL, body=TYPES_XML, status=200)
+
+    async def fetch():
+        async with AsyncProposalClient() as client:
+            return await client.types()
+
+    result = run(fetch())
+    assert result == [{'tipoSigla': 'PL', 'descricao': 'Projeto de Lei',
+                       'ativa': True}]
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_async_client_concurrency_limit():
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+
+    def callback(request):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(0.05)
+        with lock:
+            state['running'] -= 1
+        return (200, {}, TYPES_XML)
+
+    responses.add_callback(responses.GET, TYPES_URL, callback=callback)
+
+    async def fetch():
+        client = AsyncProposalClient(max_concurrency=2)
+        return await asyncio.gather(*[client.types() for _ in range(6)])
+
+    assert len(run(fetch())) == 6
+    assert state['peak'] == 2
+
+
+@responses.activate
+def test_async_client_generator_method(monkeypatch):
+    responses.add(
+        responses.GET,
+        'http://www.camara.gov.br/SitCamaraWS/Proposicoes.asmx/'
+        'ListarProposicoesTramitadasNoPeriodo',
+        body="""
+        <proposicoes>
+            <proposicao><codProposicao>1</codProposicao></proposicao>
+            <proposicao><codProposicao>2</codProposicao></proposicao>
+        </proposicoes>
+        """, status=200)
+    loop_thread = []
+
+    async def fetch():
+        loop_thread.append(threading.get_ident())
+        client = AsyncProposalClient()
+        return [record async for record in client.iter_processed_in_period(
+            '10/10/2010', '11/10/2010')]
+
+    threads = []
+    original = AsyncProposalClient._iter_get
+
+    def iter_get(self, *args, **kwargs):
+        threads.append(threading.get_ident())
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(AsyncProposalClient, '_iter_get', iter_get)
+    result = run(fetch())
+    assert result == [{'codProposicao': 1}, {'codProposicao': 2}]
+    assert threads and loop_thread[0] not in threads
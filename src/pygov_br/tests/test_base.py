@@ -1,11 +1,22 @@
 # -*- coding: utf-8 -*-
-from pygov_br.base import ClientWrapper, Client
+from pygov_br.base import (ClientWrapper, Client, EtreeParser, HostScheduler,
+                           LxmlParser, RateLimiter, RetryPolicy,
+                           TYPED_PATTERN, get_parser, requests_host)
+from pygov_br.cache import MemoryCache
+from pygov_br.metrics import MemorySink
 from pygov_br.exceptions import ClientError, ClientServerError
 from pygov_br.camara_deputados.deputy import DeputyClient
 from xml.etree.ElementTree import fromstring, ElementTree
 import datetime
+import io
+import logging
+import os
 import pytest
+import requests
 import responses
+import threading
+import time
+import timeit
 
 
 def test_client_wrapper_with_class():
@@ -24,6 +35,61 @@ def test_client_instance():
     assert client.timeout == 10
 
 
+def test_client_parser_by_name():
+    assert isinstance(Client('host', parser='etree').parser, EtreeParser)
+    assert Client('host').parser.name == get_parser().name
+
+
+def test_get_parser_unknown():
+    with pytest.raises(ValueError):
+        get_parser('html')
+
+
+def test_client_wrapper_close():
+    wrapper = ClientWrapper(deputy_client=DeputyClient)
+    session = wrapper.deputy_client.session
+    with wrapper:
+        assert wrapper.deputy_client.session is session
+    assert wrapper.deputy_client._session is None
+
+
+def test_client_session_is_reused():
+    client = Client('http://mock.com/', pool_maxsize=4)
+    assert isinstance(client.session, requests.Session)
+    assert client.session is client.session
+    adapter = client.session.get_adapter('http://mock.com/')
+    assert adapter._pool_maxsize == 4
+
+
+def test_client_session_created_once_by_threads():
+    client = Client('http://mock.com/')
+    created = []
+    make_session = client._make_session
+
+    def slow_make_session():
+        time.sleep(0.05)
+        created.append(make_session())
+        return created[-1]
+
+    client._make_session = slow_make_session
+    sessions = []
+    threads = [threading.Thread(target=lambda: sessions.append(client.session))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    assert all(session is created[0] for session in sessions)
+
+
+def test_client_shared_session_is_not_closed():
+    session = requests.Session()
+    with Client('http://mock.com/', session=session) as client:
+        assert client.session is session
+    assert client.session is session
+
+
 @responses.activate
 def test_client_get():
     responses.add(responses.GET, 'http://mock.com/path',
@@ -31,7 +97,54 @@ def test_client_get():
     response = Client('http://mock.com/')._get('path')
 
     assert len(responses.calls) == 1
-    assert response == 'data'
+    assert response == b'data'
+
+
+@responses.activate
+def test_client_get_cached():
+    responses.add(responses.GET, 'http://mock.com/path',
+                  body='data', status=200)
+    client = Client('http://mock.com/', cache=MemoryCache())
+    assert client._get('path?id=1') == b'data'
+    assert client._get('path?id=1') == b'data'
+    assert client._get('path?id=2') == b'data'
+
+    assert len(responses.calls) == 2
+    assert client.cache.hits == 1
+    assert client.cache.misses == 2
+
+
+@responses.activate
+def test_client_get_cache_revalidation():
+    responses.add(responses.GET, 'http://mock.com/path', body='data',
+                  status=200, headers={'ETag': '"v1"'})
+    responses.add(responses.GET, 'http://mock.com/path', status=304)
+    client = Client('http://mock.com/', cache=MemoryCache(ttl=-1))
+    assert client._get('path') == b'data'
+    assert client._get('path') == b'data'
+
+    assert len(responses.calls) == 2
+    assert responses.calls[1].request.headers['If-None-Match'] == '"v1"'
+
+
+@responses.activate
+def test_client_get_cache_disabled_by_endpoint():
+    responses.add(responses.GET, 'http://mock.com/path',
+                  body='data', status=200)
+    client = Client('http://mock.com/', cache=MemoryCache(),
+                    cache_ttls={'path': 0})
+    client._get('path')
+    client._get('path')
+
+    assert len(responses.calls) == 2
+    assert len(client.cache) == 0
+
+
+def test_client_cache_ttls_override():
+    client = DeputyClient(cache_ttls={'ObterPartidosCD': 10})
+    assert client.cache_ttls['ObterPartidosCD'] == 10
+    assert client.cache_ttls['ObterLideresBancadas'] == 60 * 60
+    assert DeputyClient.cache_ttls['ObterPartidosCD'] == 24 * 60 * 60
 
 
 @responses.activate
@@ -42,7 +155,7 @@ def test_client_get_with_host():
                                                host='http://mocktest.com/')
 
     assert len(responses.calls) == 1
-    assert response == 'data'
+    assert response == b'data'
 
 
 @responses.activate
@@ -65,6 +178,359 @@ def test_client_get_error_500():
     assert len(responses.calls) == 1
 
 
+@responses.activate
+def test_client_retry_server_error(caplog):
+    responses.add(responses.GET, 'http://mock.com/path', status=503)
+    responses.add(responses.GET, 'http://mock.com/path', body='data')
+    retry = RetryPolicy(backoff=0)
+    with caplog.at_level(logging.WARNING, logger='pygov_br.client'):
+        assert Client('http://mock.com/', retry=retry)._get('path') == \
+            b'data'
+
+    assert caplog.records[-1].getMessage() == \
+        'Retrying http://mock.com/path in 0.00s after attempt 1 failed: 503'
+    assert len(responses.calls) == 2
+    assert retry.retries == 1
+    assert retry.recovered == 1
+    assert retry.exhausted == 0
+
+
+@responses.activate
+def test_client_retry_exhausted():
+    responses.add(responses.GET, 'http://mock.com/path', status=500)
+    retry = RetryPolicy(max_attempts=2, backoff=0)
+    with pytest.raises(ClientServerError):
+        Client('http://mock.com/', retry=retry)._get('path')
+
+    assert len(responses.calls) == 2
+    assert retry.retries == 1
+    assert retry.recovered == 0
+    assert retry.exhausted == 1
+
+
+@responses.activate
+def test_client_retry_not_retryable():
+    responses.add(responses.GET, 'http://mock.com/path', status=404)
+    retry = RetryPolicy(backoff=0)
+    with pytest.raises(ClientError):
+        Client('http://mock.com/', retry=retry)._get('path')
+
+    assert len(responses.calls) == 1
+    assert retry.retries == 0
+
+
+@responses.activate
+def test_client_retry_connection_error():
+    responses.add(responses.GET, 'http://mock.com/path',
+                  body=requests.ConnectionError('reset'))
+    retry = RetryPolicy(max_attempts=3, backoff=0)
+    with pytest.raises(requests.ConnectionError):
+        Client('http://mock.com/', retry=retry)._get('path')
+
+    assert len(responses.calls) == 3
+    assert retry.exhausted == 1
+
+
+def test_retry_policy_backoff():
+    retry = RetryPolicy(backoff=1, max_backoff=3, jitter=0)
+    response = requests.Response()
+    response.status_code = 503
+    delays = [retry.next_delay(attempt, response) for attempt in (1, 2, 3)]
+    assert delays == [1, 2, None]
+    assert RetryPolicy(max_attempts=10, backoff=1, max_backoff=3,
+                       jitter=0).next_delay(5, response) == 3
+
+    retry = RetryPolicy(backoff=1, jitter=0.5)
+    assert 0.5 <= retry.next_delay(1, response) <= 1
+
+
+def test_retry_policy_retry_after():
+    retry = RetryPolicy(max_backoff=60)
+    response = requests.Response()
+    response.status_code = 429
+    response.headers['Retry-After'] = '12'
+    assert retry.next_delay(1, response) == 12
+
+    response.headers['Retry-After'] = 'Wed, 21 Oct 2015 07:28:00 GMT'
+    assert retry.next_delay(1, response) == 0
+
+    response.headers['Retry-After'] = '3600'
+    assert retry.next_delay(1, response) == 60
+
+
+def test_rate_limiter_reserve():
+    now = [0.0]
+    limiter = RateLimiter(rate=10, burst=2, clock=lambda: now[0])
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == pytest.approx(0.1)
+    assert limiter.reserve() == pytest.approx(0.2)
+
+    now[0] = 1.0
+    assert limiter.reserve() == 0
+
+
+@responses.activate
+def test_client_rate_limiter_shared():
+    responses.add(responses.GET, 'http://mock.com/path', body='data')
+    responses.add(responses.GET, 'http://other.com/path', body='data')
+    limiter = RateLimiter(rate=50, burst=1)
+    clients = [Client('http://mock.com/', rate_limiter=limiter),
+               Client('http://other.com/', rate_limiter=limiter)]
+    start = timeit.default_timer()
+    for client in clients * 3:
+        client._get('path')
+
+    assert timeit.default_timer() - start >= 5 / 50.0
+    assert len(responses.calls) == 6
+
+
+@responses.activate
+def test_client_scheduler_limits_host():
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+
+    def callback(request):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(0.02)
+        with lock:
+            state['running'] -= 1
+        return (200, {}, 'data')
+
+    responses.add_callback(responses.GET, 'http://mock.com/path',
+                           callback=callback)
+    scheduler = HostScheduler(max_per_host=2)
+    client = Client('http://mock.com/', scheduler=scheduler)
+    results = list(client._map(lambda: client._get('path'), [()] * 6,
+                               workers=6))
+
+    assert [result.result for result in results] == [b'data'] * 6
+    assert [result.item for result in results] == [()] * 6
+    assert state['peak'] == 2
+    assert scheduler.in_flight() == {}
+
+
+def test_client_scheduler_queues_by_method_host():
+    hosts = []
+
+    class RecordingScheduler(HostScheduler):
+        def map(self, tasks, workers=None, ordered=True):
+            tasks = list(tasks)
+            hosts.extend(task[2] for task in tasks)
+            return HostScheduler.map(self, tasks, workers, ordered)
+
+    class OtherHostClient(Client):
+        @requests_host('http://other.com/')
+        def other(self):
+            return 'other'
+
+        def own(self):
+            return 'own'
+
+    client = OtherHostClient('http://mock.com/',
+                             scheduler=RecordingScheduler())
+    assert [result.result for result in client._map(client.other, [()])] \
+        == ['other']
+    assert [result.result for result in client._map(client.own, [()])] \
+        == ['own']
+    assert hosts == ['http://other.com/', 'http://mock.com/']
+
+
+def test_host_scheduler_rejects_empty_limits():
+    with pytest.raises(ValueError):
+        HostScheduler(max_per_host=0)
+    with pytest.raises(ValueError):
+        HostScheduler(limits={'http://mock.com/': 0})
+
+
+def test_host_scheduler_takes_turns():
+    finished = {}
+
+    def call(name, delay):
+        time.sleep(delay)
+        finished[name] = timeit.default_timer()
+
+    slow = [(call, ('slow%d' % index, 0.1), 'slow') for index in range(3)]
+    fast = [(call, ('fast%d' % index, 0.01), 'fast') for index in range(3)]
+    scheduler = HostScheduler(limits={'slow': 1, 'fast': 1})
+    start = timeit.default_timer()
+    results = list(scheduler.map(slow + fast, workers=2))
+
+    assert [result.item for result in results] == slow + fast
+    assert max(finished['fast%d' % index] for index in range(3)) - start < 0.1
+
+
+def test_host_scheduler_reports_errors():
+    def divide(x, y):
+        return x / y
+
+    scheduler = HostScheduler()
+    tasks = [(divide, (1, 0), 'a'), (divide, (4, 2), 'b')]
+    results = list(scheduler.map(tasks, ordered=False))
+    results.sort(key=lambda result: result.item[1])
+    assert isinstance(results[0].error, ZeroDivisionError)
+    assert results[1].result == 2
+
+
+@responses.activate
+def test_client_metrics():
+    responses.add(responses.GET, 'http://mock.com/path',
+                  body='<parent><child>1</child></parent>')
+    sink = MemorySink()
+    client = Client('http://mock.com/', metrics=sink)
+    client._safe(client._xml_to_dict(client._get('path?id=1')))
+
+    summary = sink.summary()
+    assert sorted(summary) == ['path']
+    assert sorted(summary['path']) == ['bytes', 'latency', 'parse', 'safe',
+                                       'to_dict']
+    assert summary['path']['bytes']['sum'] == 33
+    assert all(metric['count'] == 1 for metric in summary['path'].values())
+
+
+@responses.activate
+def test_client_metrics_latency_excludes_waits():
+    responses.add(responses.GET, 'http://mock.com/path', body='data')
+    sink = MemorySink()
+    limiter = RateLimiter(1)
+    limiter.acquire = lambda: time.sleep(0.2)
+    client = Client('http://mock.com/', metrics=sink, rate_limiter=limiter)
+    client._get('path')
+
+    assert sink.histogram('path', 'latency').sum < 0.2
+
+
+def test_client_metrics_unknown_endpoint():
+    sink = MemorySink()
+    client = Client('http://mock.com/', metrics=sink)
+    client._safe({'a': '1'})
+
+    assert sorted(sink.summary()) == ['unknown']
+    assert 'endpoint="unknown"' in sink.prometheus()
+
+
+@responses.activate
+def test_client_debug_log_truncated(caplog):
+    responses.add(responses.GET, 'http://mock.com/path', body='x' * 100)
+    client = Client('http://mock.com/', log_body_bytes=10)
+    with caplog.at_level(logging.DEBUG, logger='pygov_br.client'):
+        client._get('path')
+
+    message = caplog.records[-1].getMessage()
+    assert message.endswith("{0!r}... (100 bytes)".format(b'x' * 10))
+
+
+@responses.activate
+def test_client_dump_dir(tmpdir):
+    responses.add(responses.GET, 'http://mock.com/path/ObterDeputados',
+                  body='data')
+    dump_dir = str(tmpdir.join('dumps'))
+    client = Client('http://mock.com/path/', dump_dir=dump_dir)
+    client._get('ObterDeputados?id=1')
+    client._get('ObterDeputados?id=2')
+
+    names = sorted(os.listdir(dump_dir))
+    assert len(names) == 2
+    assert names[0].endswith('-ObterDeputados-200.xml')
+    with open(os.path.join(dump_dir, names[0]), 'rb') as dump_file:
+        assert dump_file.read() == b'data'
+
+
+@responses.activate
+def test_client_iter_get():
+    xml_string = """
+    <parent>
+        <child><id>1</id><child>nested</child></child>
+        <child><id>2</id></child>
+    </parent>
+    """
+    responses.add(responses.GET, 'http://mock.com/path',
+                  body=xml_string, status=200)
+    result = Client('http://mock.com/')._iter_get('path', 'child')
+    assert list(result) == [{'id': '1', 'child': 'nested'}, {'id': '2'}]
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_client_iter_get_error():
+    responses.add(responses.GET, 'http://mock.com/path',
+                  body='service unavailable', status=503)
+    with pytest.raises(ClientServerError):
+        list(Client('http://mock.com/')._iter_get('path', 'child'))
+
+
+@pytest.mark.parametrize('parser', ['etree', 'lxml'])
+def test_client_parsers_from_bytes(parser):
+    if parser == 'lxml':
+        pytest.importorskip('lxml')
+    xml_bytes = u"""<?xml version="1.0" encoding="utf-8"?>
+    <parent>
+        <!-- comments are ignored -->
+        <child id="1"><nome>Antônio</nome></child>
+        <child id="2"><nome>Jácome</nome></child>
+    </parent>
+    """.encode('utf-8')
+    client = Client('http://mock.com/', parser=parser)
+    assert client._xml_to_dict(xml_bytes) == {
+        'parent': {'child': [{'nome': u'Antônio'}, {'nome': u'Jácome'}]},
+    }
+    assert client._xml_attributes_to_list(xml_bytes, 'child') == [
+        {'id': '1'}, {'id': '2'},
+    ]
+
+
+def test_lxml_parser_does_not_resolve_entities(tmpdir):
+    pytest.importorskip('lxml')
+    secret = tmpdir.join('secret.txt')
+    secret.write('secret')
+    xml_bytes = u"""<?xml version="1.0"?>
+    <!DOCTYPE parent [<!ENTITY secret SYSTEM "file://{0}">]>
+    <parent><child>&secret;</child></parent>
+    """.format(secret).encode('utf-8')
+    parser = LxmlParser()
+    assert not parser.options['huge_tree']
+    root = parser.fromstring(xml_bytes)
+    assert 'secret' not in (root.find('child').text or '')
+    for _, element in parser.iterparse(io.BytesIO(xml_bytes), ('end',)):
+        assert 'secret' not in (element.text or '')
+    assert LxmlParser(huge_tree=True).options['huge_tree']
+
+
+def test_client_map_ordered():
+    client = Client('http://mock.com/')
+    results = list(client._map(lambda x, y: x + y, [(1, 2), (3, 4)]))
+    assert [result.item for result in results] == [(1, 2), (3, 4)]
+    assert [result.result for result in results] == [3, 7]
+    assert [result.error for result in results] == [None, None]
+
+
+def test_client_map_reports_errors():
+    def divide(x, y):
+        return x / y
+
+    client = Client('http://mock.com/')
+    results = list(client._map(divide, [(1, 0), (4, 2)], ordered=False))
+    results.sort(key=lambda result: result.item)
+    assert isinstance(results[0].error, ZeroDivisionError)
+    assert results[1].result == 2
+
+
+def test_client_map_closed_early():
+    calls = []
+
+    def call(item):
+        calls.append(item)
+        return item
+
+    client = Client('http://mock.com/')
+    results = client._map(call, [(index,) for index in range(40)], workers=2)
+    assert next(results).result == 0
+    results.close()
+    assert len(calls) <= 4
+
+
 def test_xml_attributes_to_list():
     xml_string = """
     <parent>
@@ -134,6 +600,22 @@ def test_make_dict_from_empty_tree():
     assert client._make_dict_from_tree(etree.getroot()) == expected_dict
 
 
+@pytest.mark.parametrize('string,group', [
+    ('12', 'int'),
+    ('-12.5', 'float'),
+    ('12/03/2016', 'date'),
+    ('12/03/2016 10:30:05', 'datetime'),
+    ('10:30', 'time'),
+])
+def test_typed_pattern_group(string, group):
+    assert TYPED_PATTERN.match(string).lastgroup == group
+
+
+def test_typed_pattern_whole_string():
+    assert TYPED_PATTERN.match('12 apples') is None
+    assert TYPED_PATTERN.match('10:30 h') is None
+
+
 def test_safe_str_element():
     client = Client('http://mock.com/')
     assert type(client._safe_element('String')) == str
@@ -220,3 +702,117 @@ def test_safe_element():
     assert type(client._safe('10/10/2010')) == datetime.date
     assert type(client._safe('10/10/2010 10:10')) == datetime.datetime
     assert type(client._safe('10/10/2010 10:10:20')) == datetime.datetime
+
+
+@pytest.mark.parametrize('string', [
+    '1', '-10', '007', '1.2', '.5', '5.', '1e5', '1_000', 'inf', 'nan',
+    u'١٢', 'True', 'false', 'n', 'off', 'sim', '', ' ', ' text ',
+    '3215-5412', '10/10/2010', ' 1/10/2010', '31/02/2010',
+    '10/10/2010 10:10', '10/10/2010  10:10:59', '10/10/2010 24:00',
+    '10:30', '10:30:40', '24:00', '10:60',
+])
+def test_safe_string_matches_guess_type(string):
+    client = Client('http://mock.com/')
+    result = client._safe_string(string)
+    expected = client._guess_type(string)
+    assert type(result) is type(expected)
+    if expected == expected:
+        assert result == expected
+    assert getattr(result, 'tzinfo', None) == getattr(expected, 'tzinfo',
+                                                      None)
+
+
+def test_safe_with_schema():
+    client = Client('http://mock.com/')
+    schema = {
+        'fone': str,
+        'sexo': str,
+        'id': int,
+        'ativa': bool,
+        'data': datetime.date,
+        'inicio': datetime.datetime,
+        'hora': datetime.time,
+    }
+    test_dict = {
+        'fone': '32155412',
+        'sexo': 'F',
+        'id': ['1', '2'],
+        'ativa': '1',
+        'data': '10/10/2010',
+        'inicio': '10/10/2010 10:10',
+        'hora': '10:20',
+        'nested': {'fone': ' 3215-5412 ', 'other': '1'},
+        'unknown': 'True',
+    }
+    result = client._safe(test_dict, schema)
+    assert result['fone'] == '32155412'
+    assert result['sexo'] == 'F'
+    assert result['id'] == [1, 2]
+    assert result['ativa'] is True
+    assert result['data'] == datetime.date(2010, 10, 10)
+    assert result['inicio'] == client._safe_string('10/10/2010 10:10')
+    assert result['hora'] == datetime.time(10, 20)
+    assert result['nested'] == {'fone': '3215-5412', 'other': 1}
+    assert result['unknown'] is True
+
+
+def test_safe_with_schema_fallback():
+    client = Client('http://mock.com/')
+    schema = {'id': int, 'data': datetime.date, 'empty': str}
+    test_dict = {'id': 'TipoParlamentar_1', 'data': '10/10/2010 10:10',
+                 'empty': ''}
+    result = client._safe(test_dict, schema)
+    assert result['id'] == 'TipoParlamentar_1'
+    assert isinstance(result['data'], datetime.datetime)
+    assert result['empty'] is None
+
+
+def recursive_dict_from_tree(tree, accum):
+    """Recursive conversion, as done before the iterative converter."""
+    if tree is None:
+        return accum
+
+    if len(tree):
+        accum[tree.tag] = {}
+        for each in tree:
+            result = recursive_dict_from_tree(each, {})
+            if each.tag in accum[tree.tag]:
+                if not isinstance(accum[tree.tag][each.tag], list):
+                    accum[tree.tag][each.tag] = [accum[tree.tag][each.tag]]
+                accum[tree.tag][each.tag].append(result[each.tag])
+            else:
+                accum[tree.tag].update(result)
+    else:
+        accum[tree.tag] = tree.text
+
+    return accum
+
+
+@pytest.mark.parametrize('xml_string', [
+    '<leaf>text</leaf>',
+    '<empty/>',
+    '<parent><child>1</child></parent>',
+    '<parent><child>1</child><child>2</child><child>3</child></parent>',
+    '<parent><a>1</a><b>2</b><a>3</a><b><c>4</c></b></parent>',
+    '<parent><a><b><c><d>deep</d></c></b></a><a/></parent>',
+    '<parent attr="ignored">text<child>1</child>tail</parent>',
+    """
+    <proposicao>
+        <andamento>
+            <tramitacao><data>10/10/2010</data><orgao>MESA</orgao></tramitacao>
+            <tramitacao><data>11/10/2010</data><orgao>PLEN</orgao></tramitacao>
+        </andamento>
+        <ultimaAcao>
+            <tramitacao><data>11/10/2010</data></tramitacao>
+        </ultimaAcao>
+        <apensadas/>
+    </proposicao>
+    """,
+])
+def test_make_dict_from_tree_matches_recursive(xml_string):
+    client = Client('http://mock.com/')
+    root = fromstring(xml_string)
+    expected = recursive_dict_from_tree(root, {})
+    result = client._make_dict_from_tree(root)
+    assert result == expected
+    assert repr(result) == repr(expected)
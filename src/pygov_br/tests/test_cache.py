@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+from pygov_br.cache import DiskCache, MemoryCache
+import os
+
+
+def test_memory_cache_get_and_set():
+    cache = MemoryCache()
+    assert cache.get('key') is None
+    cache.set('key', 'value')
+    assert cache.get('key') == 'value'
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_memory_cache_expired_entry():
+    cache = MemoryCache()
+    cache.set('key', 'value', ttl=-1, etag='"abc"')
+    assert cache.get('key') is None
+    entry = cache.get_entry('key')
+    assert not entry.fresh
+    assert entry.value == 'value'
+    assert entry.etag == '"abc"'
+    assert cache.misses == 2
+
+
+def test_memory_cache_lru_eviction():
+    cache = MemoryCache(max_size=2)
+    cache.set('first', 1)
+    cache.set('second', 2)
+    cache.get('first')
+    cache.set('third', 3)
+    assert len(cache) == 2
+    assert cache.get('second') is None
+    assert cache.get('first') == 1
+    assert cache.get('third') == 3
+
+
+def test_memory_cache_clear():
+    cache = MemoryCache()
+    cache.set('key', 'value')
+    cache.get('key')
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hits == 0
+    assert cache.misses == 0
+
+
+def test_disk_cache_persists(tmpdir):
+    path = str(tmpdir.join('cache.sqlite'))
+    cache = DiskCache(path)
+    value = u'valor com acentuação'.encode('utf-8')
+    cache.set('key', value, last_modified='date')
+    cache.close()
+
+    cache = DiskCache(path)
+    entry = cache.get_entry('key')
+    assert entry.value == value
+    assert entry.last_modified == 'date'
+    assert entry.fresh
+    assert len(cache) == 1
+    assert os.path.exists(path)
+
+
+def test_disk_cache_expired_entry(tmpdir):
+    cache = DiskCache(str(tmpdir.join('cache.sqlite')))
+    cache.set('key', b'value', ttl=-1)
+    assert cache.get('key') is None
+    assert cache.get_entry('key').value == b'value'
+
+
+def test_disk_cache_eviction(tmpdir):
+    cache = DiskCache(str(tmpdir.join('cache.sqlite')), max_size=30)
+    cache.set('first', b'a' * 100)
+    cache.set('second', b'b' * 100)
+    cache.get('first')
+    cache.set('third', b'c' * 100)
+    assert cache.size <= 30
+    assert cache.get('second') is None
+    assert cache.get('third') == b'c' * 100
+
+
+def test_disk_cache_clear(tmpdir):
+    cache = DiskCache(str(tmpdir.join('cache.sqlite')))
+    cache.set('key', b'value')
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.size == 0
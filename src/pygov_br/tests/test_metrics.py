@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+from pygov_br.metrics import CallbackSink, Histogram, MemorySink
+
+
+def test_histogram():
+    histogram = Histogram((1, 2, 5))
+    for value in (0.5, 1, 1.5, 4, 10):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.count == 5
+    assert histogram.sum == 17
+    assert histogram.mean == 3.4
+    assert histogram.quantile(0.5) == 2
+    assert histogram.quantile(1) == float('inf')
+
+
+def test_callback_sink():
+    values = []
+    sink = CallbackSink(lambda *args: values.append(args))
+    sink.record('ObterDeputados', 'latency', 0.1)
+    assert values == [('ObterDeputados', 'latency', 0.1)]
+
+
+def test_memory_sink_summary():
+    sink = MemorySink(buckets={'bytes': (10, 100)})
+    sink.record('ObterDeputados', 'bytes', 50)
+    sink.record('ObterDeputados', 'bytes', 150)
+    sink.record('ObterPartidosCD', 'latency', 0.5)
+    assert sink.histogram('ObterDeputados', 'bytes').counts == [0, 1, 1]
+    assert sink.summary() == {
+        'ObterDeputados': {'bytes': {'count': 2, 'sum': 200, 'mean': 100}},
+        'ObterPartidosCD': {'latency': {'count': 1, 'sum': 0.5,
+                                        'mean': 0.5}},
+    }
+    sink.clear()
+    assert sink.summary() == {}
+
+
+def test_memory_sink_prometheus():
+    sink = MemorySink(buckets={'bytes': (10, 100)})
+    sink.record('ObterDeputados', 'bytes', 50)
+    sink.record('ObterDeputados', 'bytes', 150)
+    assert sink.prometheus(prefix='cd') == '\n'.join([
+        '# HELP cd_response_bytes Size of the response bodies.',
+        '# TYPE cd_response_bytes histogram',
+        'cd_response_bytes_bucket{endpoint="ObterDeputados",le="10.0"} 0',
+        'cd_response_bytes_bucket{endpoint="ObterDeputados",le="100.0"} 1',
+        'cd_response_bytes_bucket{endpoint="ObterDeputados",le="+Inf"} 2',
+        'cd_response_bytes_sum{endpoint="ObterDeputados"} 200.0',
+        'cd_response_bytes_count{endpoint="ObterDeputados"} 2',
+    ]) + '\n'
+    assert MemorySink().prometheus() == ''
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from pygov_br.base import RetryPolicy
+from pygov_br.benchmarks.server import StubServer
+from pygov_br.camara_deputados.deputy import DeputyClient
+from pygov_br.camara_deputados.legislative_body import LegislativeBodyClient
+from pygov_br.camara_deputados.proposal import ProposalClient
+from pygov_br.camara_deputados.session import SessionClient
+from pygov_br.exceptions import ClientError, ClientServerError
+import pytest
+import timeit
+
+TYPES_XML = u"""
+<siglas>
+    <sigla tipoSigla="PL" descricao="Projeto de Lei" ativa="True"/>
+</siglas>
+"""
+
+
+def test_stub_server_serves_all_clients():
+    with StubServer() as server:
+        session = server.session()
+        assert len(DeputyClient(session=session).all()) == 513
+        assert LegislativeBodyClient(session=session).roles()[1] == {
+            'id': 2, 'descricao': u'1º Vice-Presidente'}
+        assert ProposalClient(session=session).progress(3962, 2008)
+        assert SessionClient(session=session).full_speech(1, 1, 1, 1)
+        assert server.requests == 4
+
+
+def test_stub_server_unknown_endpoint():
+    with StubServer(bodies={}) as server:
+        with pytest.raises(ClientError):
+            ProposalClient(session=server.session()).types()
+
+
+def test_stub_server_errors():
+    bodies = {'ListarSiglasTipoProposicao': TYPES_XML}
+    with StubServer(bodies=bodies, error_rate=1) as server:
+        client = ProposalClient(session=server.session(),
+                                retry=RetryPolicy(backoff=0))
+        with pytest.raises(ClientServerError):
+            client.types()
+        assert server.errors == 3
+
+
+def test_stub_server_latency():
+    bodies = {'ListarSiglasTipoProposicao': TYPES_XML}
+    with StubServer(bodies=bodies, latency=0.05) as server:
+        client = ProposalClient(session=server.session())
+        start = timeit.default_timer()
+        for _ in range(3):
+            assert client.types()[0]['tipoSigla'] == 'PL'
+        assert timeit.default_timer() - start >= 0.15